@@ -1,77 +1,225 @@
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from typing import AsyncIterator, Literal, Optional
+
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+import logging
+import os
+
 import pytesseract
 
+from app.api.v1.uploads import spool_and_hash
+from app.core.db import AsyncSessionLocal
 from app.schemas.document import DocumentAnalysisResponse, DocumentDetail, DocumentRecord, DocumentType
-from app.services import document_service
+from app.services import document_service, fast_classifier, semcache
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/documents", tags=["documents"])
 
 
-@router.post("/analyze", response_model=DocumentAnalysisResponse)
-async def analyze_document(file: UploadFile = File(...)) -> DocumentAnalysisResponse:
+_NO_TEXT_DETAIL = (
+    "Could not extract any text from the document. "
+    "If this is a scanned/image-based PDF, text extraction will be empty. "
+    "Try uploading a TIFF, or enable OCR for PDFs with PDF_OCR_ENABLED=1 (requires Tesseract). "
+    "Also ensure the backend dependency 'pymupdf' is installed (pip install -e .) "
+    "to improve PDF text extraction."
+)
+
+_PDF_TESSERACT_MISSING_DETAIL = (
+    "PDF OCR is enabled but Tesseract OCR was not found. "
+    "Install Tesseract and ensure it is on PATH, or set TESSERACT_CMD to the full path of tesseract.exe."
+)
+
+_TIFF_TESSERACT_MISSING_DETAIL = (
+    "Tesseract OCR is required to process TIFF files but was not found. "
+    "Install Tesseract and ensure it is on PATH, or set the TESSERACT_CMD environment variable "
+    "to the full path of tesseract.exe (Windows). See the repo README for details."
+)
+
+
+def _validate_upload(file: UploadFile) -> str:
+    """Return the lower-cased filename, or raise 400 for unsupported uploads."""
+
     if not file.filename:
         raise HTTPException(status_code=400, detail="Filename is required")
 
     filename = file.filename.lower()
 
-    # Ensure we start reading from the beginning of the stream
-    await file.seek(0)
+    if not filename.endswith((".pdf", ".tif", ".tiff")):
+        raise HTTPException(status_code=400, detail="Unsupported file type. Please upload a PDF or TIFF file.")
+
+    return filename
 
-    if filename.endswith(".pdf"):
+
+# "dense" (single block of text, the fax default) or "sparse" (complex layout:
+# columns, forms, tables) - picks Tesseract's page segmentation mode.
+OcrHint = Optional[Literal["dense", "sparse"]]
+
+
+@router.post("/analyze", response_model=DocumentAnalysisResponse)
+async def analyze_document(
+    file: UploadFile = File(...),
+    hint: OcrHint = Query(None, description="OCR layout hint: dense (default) or sparse"),
+) -> DocumentAnalysisResponse:
+    filename = _validate_upload(file)
+    text = await _extract_upload(file, filename, document_service.ocr_psm(hint))
+    return await _analyze_text(filename, text)
+
+
+@router.post("/analyze/batch", response_model=list[DocumentAnalysisResponse])
+async def analyze_documents_batch(
+    files: list[UploadFile] = File(...),
+    hint: OcrHint = Query(None, description="OCR layout hint: dense (default) or sparse"),
+) -> list[DocumentAnalysisResponse]:
+    """Analyze several documents and store all results in a single transaction.
+
+    Fails with 400 (storing nothing) if any file is unsupported or has no text.
+    """
+
+    filenames = [_validate_upload(file) for file in files]
+    psm = document_service.ocr_psm(hint)
+
+    texts: list[str] = []
+    for file, filename in zip(files, filenames):
+        text = await _extract_upload(file, filename, psm)
+        if not text or not text.strip():
+            raise HTTPException(status_code=400, detail=f"{file.filename}: {_NO_TEXT_DETAIL}")
+        texts.append(text)
+
+    # LLM calls for the different files run concurrently.
+    results = await asyncio.gather(
+        *(run_in_threadpool(_classify_and_summarize, text) for text in texts)
+    )
+
+    items = [
+        {
+            "filename": filename,
+            "text": text,
+            "doc_type": doc_type,
+            "classification_reason": classification_reason,
+            "summary": summary,
+        }
+        for filename, text, (doc_type, classification_reason, summary) in zip(filenames, texts, results)
+    ]
+
+    async with AsyncSessionLocal.begin() as session:
+        await document_service.persist_document_analyses_bulk(session, items)
+
+    return [
+        DocumentAnalysisResponse(
+            type=item["doc_type"],
+            summary=item["summary"],
+            text_length=len(item["text"]),
+            classification_reason=item["classification_reason"],
+        )
+        for item in items
+    ]
+
+
+async def _extract_upload(file: UploadFile, filename: str, psm: int) -> str:
+    """Extract text from an upload, reusing cached text for files seen before."""
+
+    # OCR runs in a separate process, so spill the upload to disk and pass the path.
+    # Re-uploads of the same file reuse the stored text instead of re-running OCR.
+    # The cache uses a sync session (and may ask Tesseract its version), so it
+    # runs in the threadpool rather than on the event loop.
+    tmp_path, sha256 = await spool_and_hash(file)
+
+    try:
+        text = await run_in_threadpool(document_service.get_cached_text, sha256, psm)
+        if text is None:
+            text = await _run_extraction(filename, tmp_path, psm)
+            if text and text.strip():
+                await run_in_threadpool(document_service.cache_extracted_text, sha256, text, psm)
+    finally:
         try:
-            text = document_service.extract_text_from_pdf(file.file)
-        except pytesseract.pytesseract.TesseractNotFoundError:
-            raise HTTPException(
-                status_code=400,
-                detail=(
-                    "PDF OCR is enabled but Tesseract OCR was not found. "
-                    "Install Tesseract and ensure it is on PATH, or set TESSERACT_CMD to the full path of tesseract.exe."
-                ),
-            )
-        except RuntimeError as e:
-            raise HTTPException(status_code=400, detail=str(e))
-    elif filename.endswith(".tif") or filename.endswith(".tiff"):
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+    return text
+
+
+@router.post("/analyze/stream")
+async def analyze_document_stream(
+    file: UploadFile = File(...),
+    hint: OcrHint = Query(None, description="OCR layout hint: dense (default) or sparse"),
+) -> StreamingResponse:
+    """Analyze a document, streaming its text page by page as NDJSON.
+
+    Emits one ``{"page": n, "text": ...}`` line per page (TIFF frame) as soon as
+    it is extracted, then a final ``{"result": {...}}`` line with the same fields
+    as /analyze. Errors after the stream has started arrive as ``{"error": ...}``.
+    """
+
+    filename = _validate_upload(file)
+    tmp_path, sha256 = await spool_and_hash(file)
+    return StreamingResponse(
+        _stream_analysis(filename, tmp_path, sha256, document_service.ocr_psm(hint)),
+        media_type="application/x-ndjson",
+    )
+
+
+async def _stream_analysis(filename: str, tmp_path: str, sha256: str, psm: int) -> AsyncIterator[str]:
+    texts: list[str] = []
+    try:
+        cached = await run_in_threadpool(document_service.get_cached_text, sha256, psm)
+        if cached is not None:
+            texts.append(cached)
+            yield json.dumps({"page": 0, "text": cached}) + "\n"
+        else:
+            pages = document_service.iter_page_texts(tmp_path, psm)
+            while (page := await run_in_threadpool(next, pages, None)) is not None:
+                yield json.dumps({"page": len(texts), "text": page}) + "\n"
+                texts.append(page)
+
+        text = "\n".join(t for t in texts if t.strip()).strip()
+        if cached is None and text:
+            await run_in_threadpool(document_service.cache_extracted_text, sha256, text, psm)
+
+        result = await _analyze_text(filename, text)
+        yield json.dumps({"result": result.model_dump(mode="json")}) + "\n"
+    except HTTPException as e:
+        yield json.dumps({"error": e.detail}) + "\n"
+    except pytesseract.pytesseract.TesseractNotFoundError:
+        detail = _PDF_TESSERACT_MISSING_DETAIL if filename.endswith(".pdf") else _TIFF_TESSERACT_MISSING_DETAIL
+        yield json.dumps({"error": detail}) + "\n"
+    except RuntimeError as e:
+        yield json.dumps({"error": str(e)}) + "\n"
+    except Exception as e:
+        # The 200 status line is already sent; end the body with an error
+        # line rather than truncating it.
+        logger.exception(f"Streaming analysis of {filename} failed")
+        yield json.dumps({"error": f"Analysis failed: {e}"}) + "\n"
+    finally:
         try:
-            text = document_service.extract_text_from_tiff(file.file)
-        except pytesseract.pytesseract.TesseractNotFoundError:
-            raise HTTPException(
-                status_code=400,
-                detail=(
-                    "Tesseract OCR is required to process TIFF files but was not found. "
-                    "Install Tesseract and ensure it is on PATH, or set the TESSERACT_CMD environment variable "
-                    "to the full path of tesseract.exe (Windows). See the repo README for details."
-                ),
-            )
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported file type. Please upload a PDF or TIFF file.")
+            os.unlink(tmp_path)
+        except OSError:
+            pass
 
-    if not text or not text.strip():
-        raise HTTPException(
-            status_code=400,
-            detail=(
-                "Could not extract any text from the document. "
-                "If this is a scanned/image-based PDF, text extraction will be empty. "
-                "Try uploading a TIFF, or enable OCR for PDFs with PDF_OCR_ENABLED=1 (requires Tesseract). "
-                "Also ensure the backend dependency 'pymupdf' is installed (pip install -e .) "
-                "to improve PDF text extraction."
-            ),
-        )
 
-    doc_type, classification_reason = document_service.classify_document_type(text)
+async def _analyze_text(filename: str, text: str | None) -> DocumentAnalysisResponse:
+    """Classify, summarize and persist extracted text."""
 
-    if doc_type == DocumentType.junk_fax:
-        summary = "Document appears to be junk fax or contains insufficient clinical content to summarize."
-    else:
-        summary = document_service.summarize_document(text)
+    if not text or not text.strip():
+        raise HTTPException(status_code=400, detail=_NO_TEXT_DETAIL)
+
+    # Blocking LLM calls; keep them off the event loop.
+    doc_type, classification_reason, summary = await run_in_threadpool(_classify_and_summarize, text)
 
     # Persist analysis to SQLite
-    document_service.persist_document_analysis(
-        filename=filename,
-        text=text,
-        doc_type=doc_type,
-        classification_reason=classification_reason,
-        summary=summary,
-    )
+    async with AsyncSessionLocal.begin() as session:
+        await document_service.persist_document_analysis(
+            session,
+            filename=filename,
+            text=text,
+            doc_type=doc_type,
+            classification_reason=classification_reason,
+            summary=summary,
+        )
 
     return DocumentAnalysisResponse(
         type=doc_type,
@@ -81,6 +229,61 @@ async def analyze_document(file: UploadFile = File(...)) -> DocumentAnalysisResp
     )
 
 
+def _classify_and_summarize(text: str) -> tuple[DocumentType, str, str]:
+    """Return (doc_type, classification_reason, summary) for extracted text."""
+
+    # Obvious documents are routed by keywords; the rest go to the LLM.
+    # Near-duplicate documents reuse earlier classifications via the semantic
+    # cache. Summaries describe the patient, so they are only reused for the
+    # exact same text.
+    fast_type, margin = fast_classifier.predict(text)
+    if fast_type is None or margin < fast_classifier.min_margin():
+        # One LLM call returns both the classification and the summary.
+        analysis: list[tuple[DocumentType, str, str]] = []
+
+        def analyze() -> tuple[DocumentType, str]:
+            analysis.append(document_service.analyze_document(text))
+            return analysis[0][:2]
+
+        def summarize() -> str:
+            if analysis:
+                return analysis[0][2]
+            if doc_type == DocumentType.junk_fax:
+                return document_service.JUNK_FAX_SUMMARY
+            return document_service.summarize_document(text)
+
+        doc_type, classification_reason = semcache.get_or_compute(text, "classify", analyze)
+        doc_type = DocumentType(doc_type)
+        summary = semcache.get_or_compute(text, "document_summary", summarize, semantic=False)
+        return doc_type, classification_reason, summary
+
+    # The keyword classifier never predicts junk_fax, so there is always a summary to write.
+    classification_reason = f"Keyword match for {fast_type.value} (margin {margin:.2f})."
+    summary = semcache.get_or_compute(
+        text, "document_summary", lambda: document_service.summarize_document(text), semantic=False
+    )
+
+    return fast_type, classification_reason, summary
+
+
+async def _run_extraction(filename: str, tmp_path: str, psm: int) -> str:
+    """Extract text in the OCR pool, translating OCR setup errors to 400s."""
+
+    if filename.endswith(".pdf"):
+        try:
+            # Waits on the pool from a worker thread while pages OCR in parallel.
+            return await run_in_threadpool(document_service.extract_text_from_pdf_path, tmp_path, psm)
+        except pytesseract.pytesseract.TesseractNotFoundError:
+            raise HTTPException(status_code=400, detail=_PDF_TESSERACT_MISSING_DETAIL)
+        except RuntimeError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        try:
+            return await run_in_threadpool(document_service.extract_text_from_tiff_path, tmp_path, psm)
+        except pytesseract.pytesseract.TesseractNotFoundError:
+            raise HTTPException(status_code=400, detail=_TIFF_TESSERACT_MISSING_DETAIL)
+
+
 @router.get("/", response_model=list[DocumentRecord])
 async def list_documents(limit: int = 20) -> list[DocumentRecord]:
     """List recently analyzed documents.
@@ -88,7 +291,8 @@ async def list_documents(limit: int = 20) -> list[DocumentRecord]:
     Results are ordered from newest to oldest.
     """
 
-    return document_service.list_recent_documents(limit=limit)
+    async with AsyncSessionLocal() as session:
+        return await document_service.list_recent_documents(session, limit=limit)
 
 
 @router.get("/stats")
@@ -99,7 +303,8 @@ async def get_document_stats() -> dict:
 
 @router.get("/{doc_id}", response_model=DocumentDetail)
 async def get_document(doc_id: int) -> DocumentDetail:
-    item = document_service.get_document_detail(doc_id)
+    async with AsyncSessionLocal() as session:
+        item = await document_service.get_document_detail(session, doc_id)
     if not item:
         raise HTTPException(status_code=404, detail="Document not found")
     return item
@@ -107,7 +312,8 @@ async def get_document(doc_id: int) -> DocumentDetail:
 
 @router.delete("/{doc_id}")
 async def delete_document(doc_id: int) -> dict:
-    deleted = document_service.delete_document_analysis(doc_id)
+    async with AsyncSessionLocal.begin() as session:
+        deleted = await document_service.delete_document_analysis(session, doc_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Document not found")
 
@@ -3,11 +3,12 @@ API routes for fax processing system.
 """
 
 from typing import Optional
-from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi import APIRouter, File, HTTPException, Query, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
 import os
-import tempfile
-import shutil
 
+from app.api.v1.uploads import spool_and_hash
+from app.core.db import AsyncSessionLocal, SessionLocal
 from app.schemas.fax import (
     FaxRecord, FaxDetail, FaxStatus, FaxCategory,
     FaxReviewRequest, FaxReviewResponse,
@@ -18,7 +19,7 @@ from app.schemas.fax import (
     WatcherStatus
 )
 from app.services import fax_service
-from app.services.folder_watcher import get_watcher, start_watcher, stop_watcher
+from app.services.folder_watcher import WatcherState, get_watcher, start_watcher, stop_watcher
 
 router = APIRouter(prefix="/api/v1/faxes", tags=["faxes"])
 
@@ -27,11 +28,12 @@ router = APIRouter(prefix="/api/v1/faxes", tags=["faxes"])
 
 @router.get("/", response_model=list[FaxRecord])
 async def list_faxes(
+    response: Response,
     status: Optional[FaxStatus] = None,
     category: Optional[FaxCategory] = None,
     urgent_only: bool = False,
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0)
+    cursor: Optional[str] = None
 ) -> list[FaxRecord]:
     """
     List faxes with optional filtering.
@@ -40,15 +42,26 @@ async def list_faxes(
     - **category**: Filter by category (AI or final)
     - **urgent_only**: Show only urgent faxes
     - **limit**: Maximum number of results
-    - **offset**: Number of results to skip
+    - **cursor**: Value of the previous page's X-Next-Cursor header
+    
+    When more results may follow, the response carries an X-Next-Cursor header.
     """
-    return fax_service.list_faxes(
-        status=status,
-        category=category,
-        urgent_only=urgent_only,
-        limit=limit,
-        offset=offset
-    )
+    try:
+        async with AsyncSessionLocal() as session:
+            faxes = await fax_service.list_faxes(
+                session,
+                status=status,
+                category=category,
+                urgent_only=urgent_only,
+                limit=limit,
+                cursor=cursor
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if len(faxes) == limit:
+        response.headers["X-Next-Cursor"] = fax_service.encode_fax_cursor(faxes[-1])
+    return faxes
 
 
 # --- Categories Info ---
@@ -67,7 +80,8 @@ async def list_categories() -> list[dict]:
 @router.get("/queue", response_model=list[FaxRecord])
 async def get_review_queue(limit: int = Query(50, ge=1, le=200)) -> list[FaxRecord]:
     """Get faxes that are awaiting review (categorized but not yet approved)."""
-    return fax_service.list_faxes(status=FaxStatus.categorized, limit=limit)
+    async with AsyncSessionLocal() as session:
+        return await fax_service.list_faxes(session, status=FaxStatus.categorized, limit=limit)
 
 
 @router.get("/stats", response_model=FaxStats)
@@ -164,13 +178,16 @@ async def batch_review(request: FaxBatchReviewRequest) -> FaxBatchReviewResponse
             detail="Category is required when overriding"
         )
     
-    processed, failed = fax_service.batch_review_faxes(
-        fax_ids=request.fax_ids,
-        action=request.action,
-        category=request.category,
-        reason=request.reason,
-        reviewer=request.reviewer
-    )
+    # One transaction (and one commit) for the whole batch.
+    with SessionLocal.begin() as session:
+        processed, failed = fax_service.batch_review_faxes(
+            session=session,
+            fax_ids=request.fax_ids,
+            action=request.action,
+            category=request.category,
+            reason=request.reason,
+            reviewer=request.reviewer
+        )
     
     return FaxBatchReviewResponse(
         processed=processed,
@@ -182,11 +199,13 @@ async def batch_review(request: FaxBatchReviewRequest) -> FaxBatchReviewResponse
 @router.post("/batch/approve", response_model=FaxBatchReviewResponse)
 async def batch_approve(fax_ids: list[int], reviewer: Optional[str] = None) -> FaxBatchReviewResponse:
     """Batch approve multiple faxes (accept AI decisions)."""
-    processed, failed = fax_service.batch_review_faxes(
-        fax_ids=fax_ids,
-        action="approve",
-        reviewer=reviewer
-    )
+    with SessionLocal.begin() as session:
+        processed, failed = fax_service.batch_review_faxes(
+            session=session,
+            fax_ids=fax_ids,
+            action="approve",
+            reviewer=reviewer
+        )
     
     return FaxBatchReviewResponse(
         processed=processed,
@@ -215,14 +234,14 @@ async def upload_fax(file: UploadFile = File(...)) -> FaxRecord:
             detail="Unsupported file type. Please upload a PDF or TIFF file."
         )
     
-    # Save to temp file
+    # Stream to a temp file, hashing on the way so the duplicate check doesn't re-read it
+    tmp_path, file_hash = await spool_and_hash(file, fax_service.FILE_HASH_ALGORITHM)
+
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename)[1]) as tmp:
-            shutil.copyfileobj(file.file, tmp)
-            tmp_path = tmp.name
-        
-        # Process the fax
-        result = fax_service.process_new_fax(tmp_path, file.filename)
+        # Process the fax off the event loop (OCR + LLM calls block)
+        result = await run_in_threadpool(
+            fax_service.process_new_fax, tmp_path, file.filename, file_hash
+        )
         
         if not result:
             raise HTTPException(
@@ -232,13 +251,15 @@ async def upload_fax(file: UploadFile = File(...)) -> FaxRecord:
         
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         # Clean up temp file
         try:
             os.unlink(tmp_path)
-        except:
+        except OSError:
             pass
 
 
@@ -260,36 +281,30 @@ async def submit_feedback(feedback: FaxFeedbackCreate) -> FaxFeedbackRecord:
 
 # --- Watcher Endpoints ---
 
-@router.get("/watcher/status", response_model=WatcherStatus)
-async def get_watcher_status() -> WatcherStatus:
-    """Get the status of the folder watcher service."""
-    watcher = get_watcher()
-    state = watcher.state
-    
+def _watcher_status(state: WatcherState) -> WatcherStatus:
+    """Build the API response from a watcher state snapshot (no locking or DB access)."""
     return WatcherStatus(
         is_running=state.is_running,
         watch_folder=state.watch_folder,
         files_in_queue=state.files_in_queue,
         last_scan_at=state.last_scan_at,
-        errors=state.errors,
+        errors=list(state.errors),
         currently_processing_file=state.currently_processing_file
     )
 
 
+@router.get("/watcher/status", response_model=WatcherStatus)
+async def get_watcher_status() -> WatcherStatus:
+    """Get the status of the folder watcher service."""
+    watcher = get_watcher()
+    return _watcher_status(watcher.state)
+
+
 @router.post("/watcher/start", response_model=WatcherStatus)
 async def start_folder_watcher(watch_folder: Optional[str] = None) -> WatcherStatus:
     """Start the folder watcher service."""
     watcher = start_watcher(watch_folder)
-    state = watcher.state
-    
-    return WatcherStatus(
-        is_running=state.is_running,
-        watch_folder=state.watch_folder,
-        files_in_queue=state.files_in_queue,
-        last_scan_at=state.last_scan_at,
-        errors=state.errors,
-        currently_processing_file=state.currently_processing_file
-    )
+    return _watcher_status(watcher.state)
 
 
 @router.post("/watcher/stop", response_model=WatcherStatus)
@@ -297,21 +312,12 @@ async def stop_folder_watcher() -> WatcherStatus:
     """Stop the folder watcher service."""
     stop_watcher()
     watcher = get_watcher()
-    state = watcher.state
-    
-    return WatcherStatus(
-        is_running=state.is_running,
-        watch_folder=state.watch_folder,
-        files_in_queue=state.files_in_queue,
-        last_scan_at=state.last_scan_at,
-        errors=state.errors,
-        currently_processing_file=state.currently_processing_file
-    )
+    return _watcher_status(watcher.state)
 
 
 @router.post("/watcher/scan", response_model=dict)
 async def trigger_scan() -> dict:
     """Trigger an immediate scan of the watch folder."""
     watcher = get_watcher()
-    watcher.manual_scan()
+    await run_in_threadpool(watcher.manual_scan)
     return {"success": True, "message": "Scan triggered"}
@@ -1,12 +1,14 @@
 from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
 
 from app.schemas.llm import LLMRequest, LLMResponse
-from app.services.llm_service import generate_text
+from app.services import llm_router
 
 router = APIRouter(prefix="/api/v1/llm", tags=["llm"])
 
 
 @router.post("/generate", response_model=LLMResponse)
 async def generate(request: LLMRequest) -> LLMResponse:
-    output = generate_text(request.prompt, max_tokens=request.max_tokens)
+    # Blocking Ollama call(s); keep them off the event loop.
+    output = await run_in_threadpool(llm_router.generate, request.prompt, max_tokens=request.max_tokens)
     return LLMResponse(output=output)
@@ -0,0 +1,30 @@
+import hashlib
+import os
+import tempfile
+
+from fastapi import UploadFile
+
+CHUNK_SIZE = 1 << 20  # 1 MiB
+
+
+async def spool_and_hash(upload: UploadFile, hash_name: str = "sha256") -> tuple[str, str]:
+    """Stream an upload to a temp file while hashing it.
+
+    One pass over the upload yields both the on-disk path (for the OCR pool)
+    and the content hash (for caching / duplicate detection), without ever
+    holding the whole file in memory. The caller owns the temp file and must
+    delete it.
+
+    Returns (tmp_path, hexdigest).
+    """
+
+    suffix = os.path.splitext(upload.filename or "")[1].lower()
+    digest = hashlib.new(hash_name)
+
+    await upload.seek(0)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        while chunk := await upload.read(CHUNK_SIZE):
+            tmp.write(chunk)
+            digest.update(chunk)
+
+    return tmp.name, digest.hexdigest()
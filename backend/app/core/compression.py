@@ -0,0 +1,13 @@
+import zstandard
+
+# Extracted text is stored zstd-compressed (see raw_text_zstd columns).
+ZSTD_LEVEL = 3
+
+
+def compress_text(text: str) -> bytes:
+    """Compress extracted text for a raw_text_zstd column."""
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(text.encode("utf-8"))
+
+
+def decompress_text(data: bytes) -> str:
+    return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
@@ -1,18 +1,109 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 # Store SQLite file in the backend folder
 SQLALCHEMY_DATABASE_URL = "sqlite:///documents.db"
+ASYNC_SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///documents.db"
 
+# Sync engine: startup DDL, the folder watcher thread and sync services.
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
 
+# Async engine: request handlers, so queries don't block the event loop.
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL)
+
+# Applied to every new SQLite connection. WAL lets readers proceed while the
+# watcher/uploads write, and synchronous=NORMAL skips the fsync per commit
+# (still durable across app crashes; only an OS crash can lose the last commits).
+SQLITE_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    "mmap_size=268435456",  # 256 MiB
+    "cache_size=-65536",  # 64 MiB
+    "busy_timeout=5000",
+    "wal_autocheckpoint=1000",
+    "foreign_keys=ON",
+)
+
+
+@event.listens_for(engine, "connect")
+@event.listens_for(async_engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_conn, _connection_record) -> None:
+    cursor = dbapi_conn.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
+# Keep in sync with the Index() definitions in app/models/fax.py.
+FAX_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_faxes_queue "
+    "ON faxes (status, priority_score DESC, received_at DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS ix_faxes_ai_category ON faxes (ai_category)",
+    "CREATE INDEX IF NOT EXISTS ix_faxes_final_category ON faxes (final_category)",
+    "CREATE INDEX IF NOT EXISTS ix_faxes_urgent_queue "
+    "ON faxes (status, is_urgent, priority_score DESC, received_at DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS ix_faxes_priority "
+    "ON faxes (priority_score DESC, received_at DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS ix_faxes_received_at ON faxes (received_at)",
+    "CREATE INDEX IF NOT EXISTS ix_faxes_reviewed_at ON faxes (reviewed_at)",
+    # Leading column of ix_faxes_queue; the standalone index only cost writes.
+    "DROP INDEX IF EXISTS ix_faxes_status",
+)
+
+
+# Converts faxes.status from the old string column to the codes in
+# app/models/fax.py FAX_STATUS_CODES (keep in sync). Indexes on status are
+# dropped first and recreated from FAX_INDEXES afterwards.
+FAX_STATUS_TO_CODES = (
+    "DROP INDEX IF EXISTS ix_faxes_status",
+    "DROP INDEX IF EXISTS ix_faxes_queue",
+    "DROP INDEX IF EXISTS ix_faxes_urgent_queue",
+    "ALTER TABLE faxes ADD COLUMN status_code SMALLINT NOT NULL DEFAULT 0",
+    "UPDATE faxes SET status_code = CASE status "
+    "WHEN 'pending' THEN 0 WHEN 'categorized' THEN 1 WHEN 'approved' THEN 2 "
+    "WHEN 'overridden' THEN 3 WHEN 'processed' THEN 4 ELSE 0 END",
+    "ALTER TABLE faxes DROP COLUMN status",
+    "ALTER TABLE faxes RENAME COLUMN status_code TO status",
+)
+
+
+# Makes ix_faxes_file_hash UNIQUE on databases created before it was. Rows that
+# already share a hash (from ingest races) keep it only on the oldest row.
+FAX_UNIQUE_FILE_HASH = (
+    "UPDATE faxes SET file_hash = NULL WHERE file_hash IS NOT NULL AND id NOT IN "
+    "(SELECT MIN(id) FROM faxes WHERE file_hash IS NOT NULL GROUP BY file_hash)",
+    "DROP INDEX IF EXISTS ix_faxes_file_hash",
+    "CREATE UNIQUE INDEX ix_faxes_file_hash ON faxes (file_hash)",
+)
+
+
+# Queue indexes created before they ended in "id DESC" (list_faxes' tiebreaker)
+# still needed a sort for it; they are dropped and recreated from FAX_INDEXES.
+FAX_QUEUE_INDEXES_WITHOUT_ID = (
+    "DROP INDEX IF EXISTS ix_faxes_queue",
+    "DROP INDEX IF EXISTS ix_faxes_urgent_queue",
+)
+
+
+# Cache kinds whose summaries were also served through the semantic tier, so a
+# fax on the same form for another patient could get this patient's summary.
+# Their rows are purged; summaries now live under exact-text-only kinds.
+SEMANTIC_SUMMARY_CACHE_KINDS = ("analyze", "summary", "fax_analyze", "fax_summary")
+
+
 def ensure_sqlite_schema() -> None:
     """Apply minimal SQLite migrations for this app.
 
@@ -32,6 +123,18 @@ def ensure_sqlite_schema() -> None:
                         "ALTER TABLE document_analyses ADD COLUMN classification_reason TEXT"
                     )
                 )
+            if "raw_text_zstd" not in existing_columns:
+                conn.execute(
+                    text(
+                        "ALTER TABLE document_analyses ADD COLUMN raw_text_zstd BLOB"
+                    )
+                )
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_document_analyses_created_at "
+                    "ON document_analyses (created_at)"
+                )
+            )
         
         # Check faxes table
         fax_rows = conn.execute(text("PRAGMA table_info(faxes)")).fetchall()
@@ -43,3 +146,33 @@ def ensure_sqlite_schema() -> None:
                         "ALTER TABLE faxes ADD COLUMN auto_approved BOOLEAN DEFAULT 0 NOT NULL"
                     )
                 )
+            if "raw_text_zstd" not in fax_columns:
+                conn.execute(text("ALTER TABLE faxes ADD COLUMN raw_text_zstd BLOB"))
+
+            fax_types = {row[1]: row[2].upper() for row in fax_rows}  # row[2] is declared type
+            if fax_types.get("status") != "SMALLINT":
+                for statement in FAX_STATUS_TO_CODES:
+                    conn.execute(text(statement))
+
+            unique_indexes = {
+                row[1] for row in conn.execute(text("PRAGMA index_list(faxes)")) if row[2]
+            }  # row[2] is the unique flag
+            if "ix_faxes_file_hash" not in unique_indexes:
+                for statement in FAX_UNIQUE_FILE_HASH:
+                    conn.execute(text(statement))
+
+            queue_columns = {
+                row[2] for row in conn.execute(text("PRAGMA index_info(ix_faxes_queue)"))
+            }  # row[2] is the column name
+            if queue_columns and "id" not in queue_columns:
+                for statement in FAX_QUEUE_INDEXES_WITHOUT_ID:
+                    conn.execute(text(statement))
+
+            # create_all() only creates indexes for new tables
+            for statement in FAX_INDEXES:
+                conn.execute(text(statement))
+
+        kinds = ", ".join(f"'{kind}'" for kind in SEMANTIC_SUMMARY_CACHE_KINDS)
+        for table in ("llm_cache", "semantic_cache"):
+            if conn.execute(text(f"PRAGMA table_info({table})")).fetchall():
+                conn.execute(text(f"DELETE FROM {table} WHERE kind IN ({kinds})"))
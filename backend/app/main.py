@@ -1,11 +1,20 @@
+import threading
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.api.v1 import api_router
-from app.core.db import Base, engine, ensure_sqlite_schema
+from app.core.db import Base, async_engine, engine, ensure_sqlite_schema
 from app.models.fax import Fax, FaxFeedback, FaxSettings  # Import fax models
+from app.models.llm_cache import LlmCacheEntry
+from app.models.ocr_cache import OcrCache
+from app.models.semantic_cache import SemanticCacheEntry
+from app.services.llm_service import preload_model
+from app.services.ocr_pool import get_ocr_pool, shutdown_ocr_pool
 
-app = FastAPI(title="Backend API", version="0.1.0")
+# orjson encodes the large list responses (faxes, documents) much faster than json.dumps
+app = FastAPI(title="Backend API", version="0.1.0", default_response_class=ORJSONResponse)
 
 origins = [
 	"http://localhost:3000",
@@ -18,6 +27,7 @@ app.add_middleware(
 	allow_credentials=True,
 	allow_methods=["*"],
 	allow_headers=["*"],
+	expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -27,6 +37,16 @@ def on_startup() -> None:
 	Base.metadata.create_all(bind=engine)
 	# Apply minimal migrations for existing SQLite DBs
 	ensure_sqlite_schema()
+	# Start the OCR worker pool up front rather than on the first upload
+	get_ocr_pool()
+	# Likewise load the LLM now, in the background so startup doesn't wait on Ollama
+	threading.Thread(target=preload_model, name="ollama-preload", daemon=True).start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+	shutdown_ocr_pool()
+	await async_engine.dispose()
 
 
 app.include_router(api_router)
@@ -1,7 +1,9 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Integer, String, Text, Boolean
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, Text, Boolean
+from sqlalchemy.orm import deferred
 
+from app.core.compression import compress_text, decompress_text
 from app.core.db import Base
 
 
@@ -16,5 +18,21 @@ class DocumentAnalysis(Base):
     auto_approved = Column(Boolean, default=False, nullable=False)
     summary = Column(Text, nullable=False)
     text_length = Column(Integer, nullable=False)
-    raw_text = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Deferred: loaded together on first access (or via undefer_group("text")),
+    # so loading a row to update or delete it doesn't read the text.
+    raw_text = deferred(Column(Text, nullable=False, default=""), group="text")  # Legacy rows only; see raw_text_zstd
+    raw_text_zstd = deferred(Column(LargeBinary, nullable=True), group="text")  # zstd-compressed UTF-8 extracted text
+    # Indexed for list_recent_documents (newest first, LIMIT n).
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    @property
+    def extracted_text(self) -> str:
+        """Full extracted text, decompressed from raw_text_zstd (or legacy raw_text)."""
+        if self.raw_text_zstd is None:
+            return self.raw_text or ""
+        return decompress_text(self.raw_text_zstd)
+
+    @extracted_text.setter
+    def extracted_text(self, text: str) -> None:
+        self.raw_text_zstd = compress_text(text)
+        self.raw_text = ""
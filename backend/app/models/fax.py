@@ -1,8 +1,11 @@
 from datetime import datetime
 from enum import Enum as PyEnum
 
-from sqlalchemy import Column, DateTime, Enum, Integer, String, Text, Boolean, Float
+from sqlalchemy import Column, DateTime, Enum, Index, Integer, LargeBinary, SmallInteger, String, Text, Boolean, Float
+from sqlalchemy.orm import deferred
+from sqlalchemy.types import TypeDecorator
 
+from app.core.compression import compress_text, decompress_text
 from app.core.db import Base
 
 
@@ -15,6 +18,32 @@ class FaxStatus(str, PyEnum):
     processed = "processed"       # Fully processed and filed
 
 
+# Stored codes for FaxStatus. Append only: existing rows hold these numbers.
+FAX_STATUS_CODES = {
+    FaxStatus.pending: 0,
+    FaxStatus.categorized: 1,
+    FaxStatus.approved: 2,
+    FaxStatus.overridden: 3,
+    FaxStatus.processed: 4,
+}
+_FAX_STATUS_BY_CODE = {code: status.value for status, code in FAX_STATUS_CODES.items()}
+
+
+class FaxStatusCode(TypeDecorator):
+    """Stores a FaxStatus as a small integer; Python code keeps using the string values.
+
+    Smaller rows and indexes, and integer comparisons/grouping in SQL.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else FAX_STATUS_CODES[FaxStatus(value)]
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else _FAX_STATUS_BY_CODE[value]
+
+
 class FaxCategory(str, PyEnum):
     """Categories for fax documents."""
     discharge_summary = "discharge_summary"
@@ -32,10 +61,10 @@ class Fax(Base):
     # File information
     filename = Column(String(512), nullable=False)
     original_path = Column(String(1024), nullable=False)  # Path in shared folder
-    file_hash = Column(String(64), nullable=True, index=True)  # To detect duplicates
+    file_hash = Column(String(64), nullable=True, unique=True, index=True)  # To detect duplicates
     
     # Processing status
-    status = Column(String(32), default=FaxStatus.pending.value, nullable=False, index=True)
+    status = Column(FaxStatusCode, default=FaxStatus.pending.value, nullable=False)  # Indexed via ix_faxes_queue
     
     # AI categorization
     ai_category = Column(String(64), nullable=True)
@@ -53,7 +82,9 @@ class Fax(Base):
     auto_approved = Column(Boolean, default=False, nullable=False)  # Was this auto-approved?
     
     # Document content
-    raw_text = Column(Text, nullable=True)
+    # Deferred: only loaded on access (see get_fax_detail); use extracted_text.
+    raw_text = deferred(Column(Text, nullable=True), group="text")  # Legacy rows only; see raw_text_zstd
+    raw_text_zstd = deferred(Column(LargeBinary, nullable=True), group="text")  # zstd-compressed UTF-8
     text_length = Column(Integer, default=0, nullable=False)
     summary = Column(Text, nullable=True)
     page_count = Column(Integer, default=1, nullable=False)
@@ -68,6 +99,43 @@ class Fax(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    @property
+    def extracted_text(self) -> str | None:
+        """Full extracted text, decompressed from raw_text_zstd (or legacy raw_text)."""
+        if self.raw_text_zstd is None:
+            return self.raw_text
+        return decompress_text(self.raw_text_zstd)
+
+    @extracted_text.setter
+    def extracted_text(self, text: str) -> None:
+        self.raw_text_zstd = compress_text(text)
+        self.raw_text = None
+
+
+# Matches list_faxes: filter by status, order by priority then received date
+# (id breaks ties for the keyset cursor), so the review queue is read in index
+# order, with no sort step, and stops at the page limit.
+Index(
+    "ix_faxes_queue", Fax.status, Fax.priority_score.desc(), Fax.received_at.desc(), Fax.id.desc()
+)
+# Same for the urgent-only queue and the dashboard's urgent count.
+Index(
+    "ix_faxes_urgent_queue",
+    Fax.status,
+    Fax.is_urgent,
+    Fax.priority_score.desc(),
+    Fax.received_at.desc(),
+    Fax.id.desc(),
+)
+# Same for list_faxes without a status filter (the "all faxes" view).
+Index("ix_faxes_priority", Fax.priority_score.desc(), Fax.received_at.desc(), Fax.id.desc())
+# Date-range counts on the dashboard (received / reviewed today, this week).
+Index("ix_faxes_received_at", Fax.received_at)
+Index("ix_faxes_reviewed_at", Fax.reviewed_at)
+# For the category filter (ai_category OR final_category).
+Index("ix_faxes_ai_category", Fax.ai_category)
+Index("ix_faxes_final_category", Fax.final_category)
+
 
 class FaxFeedback(Base):
     """Store user feedback to improve categorization over time."""
@@ -0,0 +1,15 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, String, Text
+
+from app.core.db import Base
+
+
+class LlmCacheEntry(Base):
+    """Persisted LLM result keyed by a hash of the exact source text."""
+    __tablename__ = "llm_cache"
+
+    kind = Column(String(32), primary_key=True)  # e.g. "classify", "summary"
+    text_hash = Column(String(32), primary_key=True)  # blake2b-128 hex of the text
+    value = Column(Text, nullable=False)  # JSON-encoded result
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
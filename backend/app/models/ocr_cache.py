@@ -0,0 +1,15 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, String, Text
+
+from app.core.db import Base
+
+
+class OcrCache(Base):
+    """Extracted text keyed by the SHA-256 of the uploaded file bytes."""
+    __tablename__ = "ocr_cache"
+
+    sha256 = Column(String(64), primary_key=True)
+    tesseract_version = Column(String(64), nullable=True)  # Entries from other versions are ignored
+    text = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
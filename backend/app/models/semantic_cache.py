@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, Text
+
+from app.core.db import Base
+
+
+class SemanticCacheEntry(Base):
+    """Persisted LLM result keyed by an embedding of the source document."""
+    __tablename__ = "semantic_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(32), nullable=False, index=True)  # e.g. "classify", "summary"
+    model = Column(String(128), nullable=False)  # Embedding model that produced the vector
+    embedding = Column(LargeBinary, nullable=False)  # float32, L2-normalized
+    value = Column(Text, nullable=False)  # JSON-encoded result
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
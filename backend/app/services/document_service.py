@@ -1,75 +1,159 @@
-from typing import BinaryIO
+from collections import Counter
+from functools import lru_cache
+from typing import BinaryIO, Iterator
 import os
 import json
+import math
 import re
+import threading
 from io import BytesIO
 
-from pypdf import PdfReader
-from PIL import Image, ImageSequence
+from PIL import Image, ImageOps, ImageSequence
 import pytesseract
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, undefer_group
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
+from app.core.compression import compress_text
 from app.core.db import SessionLocal
 from app.models.document_analysis import DocumentAnalysis
+from app.models.ocr_cache import OcrCache
 from app.schemas.document import DocumentType, DocumentRecord, DocumentDetail
-from app.services.llm_service import generate_text
+from app.services.llm_service import first_json_object, generate_text
+from app.services.ocr_pool import imap_ocr, map_ocr, run_ocr_sync
 
+# Tesseract's OpenMP threads oversubscribe the CPU once pages run in parallel
+# (OCR pool, concurrent requests). OpenMP reads this when libtesseract is loaded,
+# and forked pool workers inherit the parent's copy, so it has to be set before
+# tesserocr is imported. An explicit OMP_THREAD_LIMIT in the environment wins.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
 
-def extract_text_from_pdf(file_obj: BinaryIO) -> str:
-    # Read bytes once so we can try multiple extraction strategies.
-    try:
-        pdf_bytes = file_obj.read()
-    finally:
-        # Best-effort rewind for callers that may reuse the stream.
-        try:
-            file_obj.seek(0)
-        except Exception:
-            pass
+try:
+    # Optional: in-process libtesseract bindings. Keeps the model loaded
+    # instead of spawning the tesseract binary for every page.
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+
+# Tesseract page segmentation modes. Faxes are mostly a single column of text,
+# so "single block" skips layout analysis; "auto" is for complex layouts.
+PSM_AUTO = 3
+PSM_SINGLE_BLOCK = 6
+OCR_HINT_PSM = {"dense": PSM_SINGLE_BLOCK, "sparse": PSM_AUTO}
+
+_PYMUPDF_MISSING = (
+    "PDF OCR is enabled (PDF_OCR_ENABLED=1) but PyMuPDF is not installed. "
+    "Install it with 'pip install -e .' from the backend folder (or 'pip install pymupdf')."
+)
+
+
+def _extract_pdf_text(pdf: str, ocr: bool, psm: int | None) -> str:
+    """Extract text from a PDF path, with the optional OCR fallback."""
+
+    joined = "\n".join(p for p in _text_layer_pages(pdf) if p.strip()).strip()
+    if joined:
+        return joined
 
-    if not pdf_bytes:
+    # Optional OCR fallback for scanned/image-based PDFs.
+    # Enable with: PDF_OCR_ENABLED=1
+    enabled, max_pages, dpi = _pdf_ocr_settings()
+    if not ocr or not enabled:
         return ""
 
-    texts: list[str] = []
+    _configure_tesseract()
 
-    # 1) Try pypdf first (fast, pure-python; sometimes fails on certain encodings).
     try:
-        reader = PdfReader(BytesIO(pdf_bytes))
-        for page in reader.pages:
-            page_text = page.extract_text() or ""
-            if page_text.strip():
-                texts.append(page_text)
+        with _open_fitz(pdf) as doc:
+            ocr_texts: list[str] = []
+            for idx in range(min(doc.page_count, max_pages)):
+                image = _render_pdf_page(doc, idx, dpi)
+                text = _ocr_image(image, psm)
+                if text.strip():
+                    ocr_texts.append(text)
+
+            return "\n".join(ocr_texts).strip()
+    except ImportError:
+        # Surface a clear error when OCR is enabled but PyMuPDF isn't installed.
+        raise RuntimeError(_PYMUPDF_MISSING)
+    except pytesseract.pytesseract.TesseractNotFoundError:
+        # Surface a clear error when OCR is enabled but Tesseract isn't installed / on PATH.
+        raise
     except Exception:
-        # Keep going to fallbacks
-        pass
+        return ""
 
-    joined = "\n".join(texts).strip()
-    if joined:
-        return joined
 
-    # 2) Fallback to PyMuPDF (more robust for many PDFs where pypdf returns empty).
+def _page_may_have_text(page) -> bool:
+    """Cheap check for text-showing operators before pypdf's slow extract_text()."""
+
     try:
-        import fitz  # PyMuPDF
+        contents = page.get_contents()
+        if contents is None:
+            return False
+        if b"BT" in contents.get_data():
+            return True
+        # Text can also live in form XObjects drawn by the page.
+        xobjects = (page.get("/Resources") or {}).get("/XObject") or {}
+        return any(xobject.get_object().get("/Subtype") == "/Form" for xobject in xobjects.values())
+    except Exception:
+        return True
+
+
+def _open_fitz(pdf: str):
+    """Open a PDF path with PyMuPDF (raises ImportError if missing)."""
+
+    import fitz  # PyMuPDF
+
+    return fitz.open(pdf)
 
-        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
-            mupdf_texts: list[str] = []
-            for page in doc:
-                page_text = page.get_text("text") or ""
-                if page_text.strip():
-                    mupdf_texts.append(page_text)
-            joined = "\n".join(mupdf_texts).strip()
-            if joined:
-                return joined
+
+def _text_layer_pages(pdf: str) -> list[str]:
+    """Return the embedded text of each page, or an empty list if there is none.
+
+    The file is read lazily, object by object, instead of being loaded into
+    memory first.
+    """
+
+    # 1) Try PyMuPDF first (several times faster than pypdf, and more robust).
+    # If it parses the file, its answer stands: no text means a scanned PDF.
+    try:
+        with _open_fitz(pdf) as doc:
+            pages = [page.get_text("text") or "" for page in doc]
+        return pages if any(p.strip() for p in pages) else []
     except ImportError:
         pass
     except Exception:
+        # Keep going to fallbacks
         pass
 
-    # 3) Optional OCR fallback for scanned/image-based PDFs.
-    # Enable with: PDF_OCR_ENABLED=1
+    # 2) Fallback to pypdf (pure-python) when PyMuPDF is missing or fails on the file.
+    try:
+        # Imported here: only PDF extraction needs it, not the DB-only endpoints.
+        from pypdf import PdfReader
+
+        with open(pdf, "rb") as stream:
+            reader = PdfReader(stream, strict=False)
+            text_pages = [_page_may_have_text(page) for page in reader.pages]
+            if not any(text_pages):
+                # Image-only (scanned) PDF: no text layer to find.
+                return []
+            pages = [
+                (page.extract_text() or "") if has_text else ""
+                for page, has_text in zip(reader.pages, text_pages)
+            ]
+        if any(p.strip() for p in pages):
+            return pages
+    except Exception:
+        pass
+
+    return []
+
+
+def _pdf_ocr_settings() -> tuple[bool, int, int]:
+    """Read PDF OCR settings from the environment: (enabled, max_pages, dpi)."""
+
     enabled = (os.getenv("PDF_OCR_ENABLED") or "").strip().lower() in {"1", "true", "yes", "on"}
-    if not enabled:
-        return ""
 
     # Safety limits to avoid very slow OCR on large PDFs.
     try:
@@ -82,57 +166,458 @@ def extract_text_from_pdf(file_obj: BinaryIO) -> str:
     except ValueError:
         dpi = 200
 
+    return enabled, max_pages, min(dpi, _ocr_target_dpi())
+
+
+def ocr_psm(hint: str | None = None) -> int:
+    """Return the Tesseract page segmentation mode for a layout hint.
+
+    Without a hint, uses OCR_PSM (default 6, single text block).
+    """
+
+    if hint:
+        return OCR_HINT_PSM[hint]
+    try:
+        return int(os.getenv("OCR_PSM") or PSM_SINGLE_BLOCK)
+    except ValueError:
+        return PSM_SINGLE_BLOCK
+
+
+def _configure_tesseract() -> None:
     # Configure tesseract path if provided.
     tesseract_cmd = os.getenv("TESSERACT_CMD") or os.getenv("TESSERACT_PATH")
     if tesseract_cmd:
         pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
 
+
+_tesserocr_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _get_tesserocr_api():
+    """Return this process's tesserocr API, loading the language model once."""
+
     try:
-        import fitz  # PyMuPDF
+        return tesserocr.PyTessBaseAPI(
+            path=os.getenv("TESSDATA_PREFIX") or tesserocr.get_languages()[0],
+            lang="eng",
+            oem=tesserocr.OEM.LSTM_ONLY,
+            psm=tesserocr.PSM.SINGLE_BLOCK,
+        )
+    except RuntimeError:
+        # Missing tessdata; report it the same way as a missing binary.
+        raise pytesseract.pytesseract.TesseractNotFoundError() from None
 
-        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
-            ocr_texts: list[str] = []
-            scale = max(dpi, 72) / 72.0
-            matrix = fitz.Matrix(scale, scale)
 
-            for idx, page in enumerate(doc):
-                if idx >= max_pages:
-                    break
+def _ocr_target_dpi() -> int:
+    """Highest resolution worth OCRing (OCR_TARGET_DPI, default 300)."""
 
-                pix = page.get_pixmap(matrix=matrix, alpha=False)
-                image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                text = pytesseract.image_to_string(image) or ""
-                if text.strip():
-                    ocr_texts.append(text)
+    try:
+        return int(os.getenv("OCR_TARGET_DPI") or "300")
+    except ValueError:
+        return 300
 
-            return "\n".join(ocr_texts).strip()
+
+def _ocr_min_dpi() -> int:
+    """Resolution below which scans are upscaled before OCR (OCR_MIN_DPI, default 200)."""
+
+    try:
+        return int(os.getenv("OCR_MIN_DPI") or "200")
+    except ValueError:
+        return 200
+
+
+# Lower DPI values are placeholder metadata (e.g. 1x1 written by some TIFF
+# encoders), not real scan resolutions; upscaling by them would blow the image up
+# by orders of magnitude.
+MIN_PLAUSIBLE_DPI = 50
+
+
+def _axis_scale(dpi: float, target: int, minimum: int) -> float:
+    if dpi > target:
+        return target / dpi
+    if MIN_PLAUSIBLE_DPI <= dpi < minimum:
+        return minimum / dpi
+    return 1.0
+
+
+def _prepare_for_ocr(image: Image.Image) -> Image.Image:
+    """Normalize an image's resolution and contrast for Tesseract.
+
+    Each axis scanned above OCR_TARGET_DPI is scaled down to it (Tesseract gains
+    nothing above ~300 DPI but its cost grows with pixel count), and each axis
+    below OCR_MIN_DPI is scaled up to it, e.g. "normal" mode faxes at 204x98 DPI.
+    Axes without DPI metadata (or with an implausibly low placeholder) are left
+    alone. Grayscale images are then
+    contrast-stretched, which helps faint scans.
+    """
+
+    dpi = image.info.get("dpi")
+    if dpi:
+        target = _ocr_target_dpi()
+        x_scale, y_scale = (_axis_scale(float(d), target, _ocr_min_dpi()) for d in dpi)
+        if (x_scale, y_scale) != (1.0, 1.0):
+            if image.mode not in ("L", "RGB"):
+                image = image.convert("L")
+            size = (max(1, round(image.width * x_scale)), max(1, round(image.height * y_scale)))
+            image = image.resize(size, Image.Resampling.LANCZOS)
+
+    if image.mode == "L":
+        image = ImageOps.autocontrast(image)
+    return image
+
+
+def _ocr_image(image: Image.Image, psm: int | None = None) -> str:
+    """OCR one image, via tesserocr when installed, else the tesseract binary."""
+
+    if psm is None:
+        psm = ocr_psm()
+
+    image = _prepare_for_ocr(image)
+
+    if tesserocr is None:
+        # LSTM engine only, matching the tesserocr path.
+        return pytesseract.image_to_string(image, config=f"--oem 1 --psm {psm}") or ""
+
+    api = _get_tesserocr_api()
+    with _tesserocr_lock:
+        api.SetPageSegMode(psm)
+        api.SetImage(image)
+        return api.GetUTF8Text() or ""
+
+
+def _render_pdf_page(doc, page_no: int, dpi: int) -> Image.Image:
+    """Rasterize one page of an open PyMuPDF document for OCR.
+
+    Renders straight to 8-bit grayscale (a third of the bytes of RGB; Tesseract
+    binarizes anyway) and wraps the pixel buffer without another copy.
+    """
+
+    import fitz  # PyMuPDF
+
+    scale = max(dpi, 72) / 72.0
+    pix = doc[page_no].get_pixmap(
+        matrix=fitz.Matrix(scale, scale), colorspace=fitz.csGRAY, alpha=False
+    )
+    return Image.frombuffer("L", (pix.width, pix.height), pix.samples, "raw", "L", pix.stride, 1)
+
+
+def _ocr_pdf_page(pdf_path: str, page_no: int, dpi: int, psm: int | None = None) -> str:
+    """Render and OCR a single PDF page. Runs in an OCR pool worker."""
+
+    import fitz  # PyMuPDF
+
+    _configure_tesseract()
+    with fitz.open(pdf_path) as doc:
+        image = _render_pdf_page(doc, page_no, dpi)
+    return _ocr_image(image, psm)
+
+
+def _pdf_text_layer(pdf_path: str) -> tuple[str, int]:
+    """Return (text layer, page count) of a PDF; the count is 0 if there is no text.
+
+    Runs in an OCR pool worker.
+    """
+
+    pages = _text_layer_pages(pdf_path)
+    return "\n".join(p for p in pages if p.strip()).strip(), len(pages)
+
+
+def _pdf_page_count(pdf_path: str) -> int:
+    """Best-effort page count of a PDF (1 if it can't be read)."""
+
+    try:
+        with _open_fitz(pdf_path) as doc:
+            return doc.page_count
+    except Exception:
+        pass
+    try:
+        from pypdf import PdfReader
+
+        with open(pdf_path, "rb") as f:
+            return len(PdfReader(f, strict=False).pages)
+    except Exception:
+        return 1
+
+
+def extract_text_from_pdf_path(pdf_path: str, psm: int | None = None) -> str:
+    """Extract text from a PDF on disk, OCRing scanned pages in parallel.
+
+    The text layer is read in an OCR pool worker. If it is empty and PDF OCR is
+    enabled, pages are fanned out across the pool, one page per task, so a long
+    scanned fax takes roughly pages / workers OCR passes instead of pages.
+    Blocks the calling thread while waiting on the pool.
+    """
+
+    return _extract_pdf_path(pdf_path, psm)[0]
+
+
+def _extract_pdf_path(pdf_path: str, psm: int | None) -> tuple[str, int]:
+    """extract_text_from_pdf_path, also returning the page count it came across."""
+
+    text, page_count = run_ocr_sync(_pdf_text_layer, pdf_path)
+    enabled, max_pages, dpi = _pdf_ocr_settings()
+    if text:
+        return text, page_count
+    if not enabled:
+        return "", _pdf_page_count(pdf_path)
+
+    try:
+        import fitz  # PyMuPDF
+
+        with fitz.open(pdf_path) as doc:
+            page_count = doc.page_count
     except ImportError:
-        # Surface a clear error when OCR is enabled but PyMuPDF isn't installed.
-        raise RuntimeError(
-            "PDF OCR is enabled (PDF_OCR_ENABLED=1) but PyMuPDF is not installed. "
-            "Install it with 'pip install -e .' from the backend folder (or 'pip install pymupdf')."
+        raise RuntimeError(_PYMUPDF_MISSING)
+    except Exception:
+        return "", 1
+
+    ocr_pages = min(page_count, max_pages)
+    try:
+        texts = map_ocr(
+            _ocr_pdf_page,
+            [pdf_path] * ocr_pages,
+            range(ocr_pages),
+            [dpi] * ocr_pages,
+            [psm] * ocr_pages,
         )
     except pytesseract.pytesseract.TesseractNotFoundError:
-        # Surface a clear error when OCR is enabled but Tesseract isn't installed / on PATH.
         raise
     except Exception:
-        return ""
+        return "", page_count
 
+    return "\n".join(t for t in texts if t.strip()).strip(), page_count
 
-def extract_text_from_tiff(file_obj: BinaryIO) -> str:
-    tesseract_cmd = os.getenv("TESSERACT_CMD") or os.getenv("TESSERACT_PATH")
-    if tesseract_cmd:
-        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
 
-    image = Image.open(file_obj)
+def _ocr_tiff_frame(tiff_path: str, frame_no: int, psm: int | None = None) -> str:
+    """OCR a single TIFF frame. Runs in an OCR pool worker."""
+
+    _configure_tesseract()
+    with Image.open(tiff_path) as image:
+        image.seek(frame_no)
+        return _ocr_image(image, psm)
+
+
+def extract_text_from_tiff_path(tiff_path: str, psm: int | None = None) -> str:
+    """Extract text from a TIFF on disk, OCRing its frames in parallel.
+
+    Each frame is one task on the OCR pool, like PDF pages in
+    extract_text_from_pdf_path. Blocks the calling thread while waiting on the pool.
+    """
+
+    return _extract_tiff_path(tiff_path, psm)[0]
+
+
+def _extract_tiff_path(tiff_path: str, psm: int | None) -> tuple[str, int]:
+    """extract_text_from_tiff_path, also returning the frame count."""
+
+    with Image.open(tiff_path) as image:
+        frame_count = getattr(image, "n_frames", 1)
+
+    if frame_count == 1:
+        return run_ocr_sync(extract_text_from_path, tiff_path, True, psm), 1
+
+    texts = map_ocr(_ocr_tiff_frame, [tiff_path] * frame_count, range(frame_count), [psm] * frame_count)
+    return "\n".join(t for t in texts if t.strip()), frame_count
+
+
+def extract_text_and_page_count(file_path: str, psm: int | None = None) -> tuple[str, int]:
+    """Extract text from a PDF or TIFF on disk along with its page (frame) count.
+
+    The count comes from the extraction itself rather than a second parse.
+    """
+
+    if file_path.lower().endswith(".pdf"):
+        return _extract_pdf_path(file_path, psm)
+    return _extract_tiff_path(file_path, psm)
+
+
+def iter_page_texts(file_path: str, psm: int | None = None) -> Iterator[str]:
+    """Yield the text of each page (PDF) or frame (TIFF), in order, as it is ready.
+
+    Pages are OCRed in parallel on the OCR pool; each one is yielded as soon as
+    it and all pages before it are done. Blocks the calling thread.
+    """
+
+    if not file_path.lower().endswith(".pdf"):
+        with Image.open(file_path) as image:
+            frame_count = getattr(image, "n_frames", 1)
+        yield from imap_ocr(
+            _ocr_tiff_frame, [file_path] * frame_count, range(frame_count), [psm] * frame_count
+        )
+        return
+
+    pages = run_ocr_sync(_text_layer_pages, file_path)
+    enabled, max_pages, dpi = _pdf_ocr_settings()
+    if pages or not enabled:
+        yield from pages
+        return
+
+    try:
+        import fitz  # PyMuPDF
+
+        with fitz.open(file_path) as doc:
+            page_count = min(doc.page_count, max_pages)
+    except ImportError:
+        raise RuntimeError(_PYMUPDF_MISSING)
+
+    yield from imap_ocr(
+        _ocr_pdf_page,
+        [file_path] * page_count,
+        range(page_count),
+        [dpi] * page_count,
+        [psm] * page_count,
+    )
+
+
+def extract_text_from_tiff(file_obj: BinaryIO, psm: int | None = None) -> str:
+    _configure_tesseract()
+
+    # Read once and decode frames from memory: PIL seeks back into the file for
+    # every frame, which for spooled uploads can mean a disk seek per frame.
     texts: list[str] = []
-    for frame in ImageSequence.Iterator(image):
-        text = pytesseract.image_to_string(frame) or ""
-        if text.strip():
-            texts.append(text)
+    with Image.open(BytesIO(file_obj.read())) as image:
+        for frame in ImageSequence.Iterator(image):
+            text = _ocr_image(frame, psm)
+            if text.strip():
+                texts.append(text)
     return "\n".join(texts)
 
 
+def extract_text_from_path(file_path: str, ocr: bool = True, psm: int | None = None) -> str:
+    """Extract text from a PDF or TIFF on disk.
+
+    Takes a path rather than a file object so it can run in the OCR pool.
+    """
+
+    if file_path.lower().endswith(".pdf"):
+        # pypdf and PyMuPDF read the file themselves; no need to copy it into memory.
+        if os.path.getsize(file_path) == 0:
+            return ""
+        return _extract_pdf_text(file_path, ocr, psm)
+    with open(file_path, "rb") as f:
+        return extract_text_from_tiff(f, psm=psm)
+
+
+@lru_cache(maxsize=1)
+def get_ocr_version() -> str:
+    """Return the installed Tesseract version, used to tag OCR cache entries."""
+
+    _configure_tesseract()
+    try:
+        if tesserocr is not None:
+            return f"tesserocr {tesserocr.tesseract_version().splitlines()[0]}"
+        return str(pytesseract.get_tesseract_version())
+    except Exception:
+        return "unknown"
+
+
+def _cache_tag(psm: int | None) -> str:
+    # Text OCRed with a different engine version or segmentation mode is a miss.
+    return f"{get_ocr_version()} psm{psm if psm is not None else ocr_psm()}"
+
+
+def get_cached_text(sha256: str, psm: int | None = None) -> str | None:
+    """Return previously extracted text for a file hash, if cached for this OCR version."""
+
+    db: Session = SessionLocal()
+    try:
+        row = db.get(OcrCache, sha256)
+        if row is None or row.tesseract_version != _cache_tag(psm):
+            return None
+        return row.text
+    finally:
+        db.close()
+
+
+def cache_extracted_text(sha256: str, text: str, psm: int | None = None) -> None:
+    """Store extracted text for a file hash, replacing entries from older OCR versions."""
+
+    version = _cache_tag(psm)
+    stmt = sqlite_insert(OcrCache).values(sha256=sha256, tesseract_version=version, text=text)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[OcrCache.sha256],
+        set_={"tesseract_version": version, "text": text},
+    )
+
+    db: Session = SessionLocal()
+    try:
+        db.execute(stmt)
+        db.commit()
+    finally:
+        db.close()
+
+
+# Keyword fallbacks for classify_document_type, in priority order. Each table is
+# compiled into one case-insensitive alternation so the text is scanned once
+# instead of once per keyword (and without a lowered copy).
+_OUTPUT_KEYWORD_TYPES = {
+    "discharge": DocumentType.discharge_summary,
+    "inpatient": DocumentType.inpatient_document,
+    "progress": DocumentType.inpatient_document,
+    "note": DocumentType.inpatient_document,
+    "census": DocumentType.census,
+    "junk": DocumentType.junk_fax,
+}
+_TEXT_KEYWORD_TYPES = {
+    "discharge": DocumentType.discharge_summary,
+    "census": DocumentType.census,
+}
+
+
+def _keyword_re(keywords: dict[str, DocumentType]) -> re.Pattern:
+    return re.compile("|".join(re.escape(k) for k in keywords), re.IGNORECASE)
+
+
+def _keyword_ranks(keywords: dict[str, DocumentType]) -> dict[str, int]:
+    return {keyword: rank for rank, keyword in enumerate(keywords)}
+
+
+_OUTPUT_KEYWORD_RE = _keyword_re(_OUTPUT_KEYWORD_TYPES)
+_OUTPUT_KEYWORD_RANKS = _keyword_ranks(_OUTPUT_KEYWORD_TYPES)
+_TEXT_KEYWORD_RE = _keyword_re(_TEXT_KEYWORD_TYPES)
+_TEXT_KEYWORD_RANKS = _keyword_ranks(_TEXT_KEYWORD_TYPES)
+
+
+def _best_keyword(pattern: re.Pattern, ranks: dict[str, int], text: str) -> str | None:
+    """Return the highest-priority (lowest-rank) keyword found in text, if any."""
+
+    best: str | None = None
+    for match in pattern.finditer(text):
+        keyword = match.group(0).lower()
+        if best is None or ranks[keyword] < ranks[best]:
+            best = keyword
+            if ranks[keyword] == 0:
+                break
+    return best
+
+
+# Prefilter for OCR noise (failed scans, garbled text layers), which is junk
+# without asking the LLM. English prose runs about 4.0-4.5 bits per character.
+NOISE_SAMPLE_CHARS = 2000
+MIN_TEXT_ENTROPY = 3.0
+MAX_UNPRINTABLE_RATIO = 0.3
+
+
+def noise_reason(text: str) -> str | None:
+    """Return why extracted text looks like noise rather than a document, or None."""
+
+    sample = text.strip()[:NOISE_SAMPLE_CHARS]
+    if not sample:
+        return None
+
+    unprintable = sum(1 for c in sample if not (c.isprintable() or c.isspace()))
+    if unprintable > MAX_UNPRINTABLE_RATIO * len(sample):
+        return "Mostly unprintable characters; likely a garbled scan or text layer."
+
+    n = len(sample)
+    entropy = -sum(count / n * math.log2(count / n) for count in Counter(sample).values())
+    if entropy < MIN_TEXT_ENTROPY:
+        return "Low-entropy content; likely OCR noise."
+
+    return None
+
+
 def classify_document_type(text: str) -> tuple[DocumentType, str]:
     """Use the LLM to decide what kind of document this is, with a reason.
 
@@ -145,6 +630,9 @@ def classify_document_type(text: str) -> tuple[DocumentType, str]:
             DocumentType.junk_fax,
             "Insufficient extracted text to classify reliably.",
         )
+    reason = noise_reason(cleaned)
+    if reason:
+        return (DocumentType.junk_fax, reason)
 
     # Limit the length sent to the LLM for classification
     snippet = cleaned[:4000]
@@ -163,22 +651,15 @@ def classify_document_type(text: str) -> tuple[DocumentType, str]:
     )
 
     raw = generate_text(prompt, max_tokens=128).strip()
-    raw_lower = raw.lower()
 
     category: str | None = None
     reason: str | None = None
 
     # Try JSON first (tolerate extra text by extracting the first JSON object).
-    match = re.search(r"\{.*\}", raw, flags=re.DOTALL)
-    if match:
-        try:
-            payload = json.loads(match.group(0))
-            if isinstance(payload, dict):
-                category = str(payload.get("category") or "").strip().lower() or None
-                reason = str(payload.get("reason") or "").strip() or None
-        except Exception:
-            category = None
-            reason = None
+    payload = first_json_object(raw)
+    if payload is not None:
+        category = str(payload.get("category") or "").strip().lower() or None
+        reason = str(payload.get("reason") or "").strip() or None
 
     # Normalize and map model output to our enum
     if category and "discharge" in category:
@@ -191,22 +672,16 @@ def classify_document_type(text: str) -> tuple[DocumentType, str]:
         return (DocumentType.junk_fax, reason or "Classified as junk fax.")
 
     # If the model didn't return JSON, fall back to keyword matching on its raw output.
-    if "discharge" in raw_lower:
-        return (DocumentType.discharge_summary, reason or f"Model output: {raw[:300]}")
-    if "inpatient" in raw_lower or "progress" in raw_lower or "note" in raw_lower:
-        return (DocumentType.inpatient_document, reason or f"Model output: {raw[:300]}")
-    if "census" in raw_lower:
-        return (DocumentType.census, reason or f"Model output: {raw[:300]}")
-    if "junk" in raw_lower:
-        return (DocumentType.junk_fax, reason or f"Model output: {raw[:300]}")
+    keyword = _best_keyword(_OUTPUT_KEYWORD_RE, _OUTPUT_KEYWORD_RANKS, raw)
+    if keyword is not None:
+        return (_OUTPUT_KEYWORD_TYPES[keyword], reason or f"Model output: {raw[:300]}")
 
     # Fallback heuristic if LLM output is unclear
     if len(cleaned) < 150:
         return (DocumentType.junk_fax, "Short document; treating as junk fax.")
-    if "discharge" in cleaned.lower():
-        return (DocumentType.discharge_summary, "Heuristic match for 'discharge'.")
-    if "census" in cleaned.lower():
-        return (DocumentType.census, "Heuristic match for 'census'.")
+    keyword = _best_keyword(_TEXT_KEYWORD_RE, _TEXT_KEYWORD_RANKS, cleaned)
+    if keyword is not None:
+        return (_TEXT_KEYWORD_TYPES[keyword], f"Heuristic match for '{keyword}'.")
     if len(cleaned) > 300:
         return (
             DocumentType.inpatient_document,
@@ -216,6 +691,11 @@ def classify_document_type(text: str) -> tuple[DocumentType, str]:
     return (DocumentType.junk_fax, "Classification uncertain; defaulting to junk fax.")
 
 
+JUNK_FAX_SUMMARY = (
+    "Document appears to be junk fax or contains insufficient clinical content to summarize."
+)
+
+
 def summarize_document(text: str, max_tokens: int = 256) -> str:
     # Truncate very long documents before sending to the LLM
     snippet = text[:4000]
@@ -230,7 +710,70 @@ def summarize_document(text: str, max_tokens: int = 256) -> str:
     return generate_text(prompt, max_tokens=max_tokens)
 
 
-def persist_document_analysis(
+# JSON schema for Ollama's structured outputs in analyze_document.
+DOCUMENT_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "category": {"type": "string", "enum": [t.value for t in DocumentType]},
+        "reason": {"type": "string"},
+        "summary": {"type": "string"},
+    },
+    "required": ["category", "reason", "summary"],
+}
+
+
+def analyze_document(text: str) -> tuple[DocumentType, str, str]:
+    """Classify and summarize a document with a single LLM call.
+
+    Returns (document_type, classification_reason, summary). Falls back to
+    classify_document_type + summarize_document if the model's JSON is unusable.
+    """
+
+    cleaned = text.strip()
+    if len(cleaned) < 100 or noise_reason(cleaned):
+        # Too little text (or noise); classify_document_type answers without the LLM.
+        doc_type, reason = classify_document_type(text)
+        return (doc_type, reason, JUNK_FAX_SUMMARY)
+
+    snippet = cleaned[:4000]
+
+    prompt = (
+        "You are a clinical documentation assistant. "
+        "Classify the following clinical or administrative document into ONE of these categories:\n\n"
+        "- discharge_summary: a discharge summary for a patient leaving the hospital\n"
+        "- inpatient_document: any inpatient progress note, H&P, consult, or other in-hospital documentation\n"
+        "- census: a list or table of patients, often with bed numbers, units, or service names\n"
+        "- junk_fax: anything that is not a meaningful clinical or census document (e.g., scanning errors, noise, empty content, junk faxes)\n\n"
+        "Then summarize it in 3-5 bullet points, focusing on key clinical information, in plain language.\n\n"
+        "Return STRICT JSON with exactly these keys:\n"
+        "{\"category\": \"discharge_summary|inpatient_document|census|junk_fax\", \"reason\": \"...\", \"summary\": \"...\"}\n\n"
+        f"Document:\n{snippet}\n"
+    )
+
+    raw = generate_text(prompt, max_tokens=384, schema=DOCUMENT_ANALYSIS_SCHEMA)
+
+    try:
+        payload = json.loads(raw)
+        doc_type = DocumentType(str(payload["category"]).strip().lower())
+        reason = str(payload.get("reason") or "").strip() or f"Classified as {doc_type.value}."
+        summary = payload["summary"]
+        if isinstance(summary, list):
+            summary = "\n".join(f"- {item}" for item in summary)
+        summary = str(summary).strip()
+    except (ValueError, KeyError, TypeError):
+        summary = ""
+
+    if not summary:
+        doc_type, reason = classify_document_type(text)
+        summary = JUNK_FAX_SUMMARY if doc_type == DocumentType.junk_fax else summarize_document(text)
+    elif doc_type == DocumentType.junk_fax:
+        summary = JUNK_FAX_SUMMARY
+
+    return (doc_type, reason, summary)
+
+
+async def persist_document_analysis(
+    session: AsyncSession,
     *,
     filename: str,
     text: str,
@@ -240,99 +783,110 @@ def persist_document_analysis(
     review_note: str | None = None,
     auto_approved: bool = False,
 ) -> DocumentAnalysis:
-    """Persist a document analysis result to the SQLite database."""
+    """Add a document analysis result to ``session``; the caller commits."""
+
+    obj = DocumentAnalysis(
+        filename=filename,
+        doc_type=doc_type.value,
+        classification_reason=classification_reason,
+        review_note=review_note,
+        auto_approved=auto_approved,
+        summary=summary,
+        text_length=len(text),
+        extracted_text=text,
+    )
+    session.add(obj)
+    await session.flush()
+    return obj
 
-    db: Session = SessionLocal()
-    try:
-        obj = DocumentAnalysis(
-            filename=filename,
-            doc_type=doc_type.value,
-            classification_reason=classification_reason,
-            review_note=review_note,
-            auto_approved=auto_approved,
-            summary=summary,
-            text_length=len(text),
-            raw_text=text,
-        )
-        db.add(obj)
-        db.commit()
-        db.refresh(obj)
-        return obj
-    finally:
-        db.close()
 
+async def persist_document_analyses_bulk(session: AsyncSession, items: list[dict]) -> None:
+    """Insert many analyses with one executemany; the caller commits once.
 
-def list_recent_documents(limit: int = 20) -> list[DocumentRecord]:
-    """Return the most recent document analyses from the database."""
+    Each item takes the keyword arguments of persist_document_analysis.
+    """
 
-    db: Session = SessionLocal()
-    try:
-        query = (
-            db.query(DocumentAnalysis)
-            .order_by(DocumentAnalysis.created_at.desc())
-            .limit(limit)
-        )
-        items = query.all()
-        return [
-            DocumentRecord(
-                id=item.id,
-                filename=item.filename,
-                doc_type=DocumentType(item.doc_type),
-                summary=item.summary,
-                text_length=item.text_length,
-                classification_reason=getattr(item, "classification_reason", None),
-                review_note=getattr(item, "review_note", None),
-                auto_approved=getattr(item, "auto_approved", False),
-                created_at=item.created_at,
-            )
+    if not items:
+        return
+
+    await session.execute(
+        insert(DocumentAnalysis),
+        [
+            {
+                "filename": item["filename"],
+                "doc_type": item["doc_type"].value,
+                "classification_reason": item.get("classification_reason"),
+                "review_note": item.get("review_note"),
+                "auto_approved": item.get("auto_approved", False),
+                "summary": item["summary"],
+                "text_length": len(item["text"]),
+                "raw_text": "",
+                "raw_text_zstd": compress_text(item["text"]),
+            }
             for item in items
-        ]
-    finally:
-        db.close()
+        ],
+    )
+
+
+# Columns needed for DocumentRecord; raw_text is deliberately left out.
+_DOCUMENT_RECORD_COLUMNS = (
+    DocumentAnalysis.id,
+    DocumentAnalysis.filename,
+    DocumentAnalysis.doc_type,
+    DocumentAnalysis.summary,
+    DocumentAnalysis.text_length,
+    DocumentAnalysis.classification_reason,
+    DocumentAnalysis.review_note,
+    DocumentAnalysis.auto_approved,
+    DocumentAnalysis.created_at,
+)
 
 
-def delete_document_analysis(doc_id: int) -> bool:
-    """Delete a document analysis row by id.
+async def list_recent_documents(session: AsyncSession, limit: int = 20) -> list[DocumentRecord]:
+    """Return the most recent document analyses from the database."""
+
+    rows = await session.execute(
+        select(*_DOCUMENT_RECORD_COLUMNS)
+        .order_by(DocumentAnalysis.created_at.desc())
+        .limit(limit)
+    )
+    # Rows come straight from typed columns, so skip a validation pass and
+    # only convert doc_type, which is stored as a plain string.
+    return [
+        DocumentRecord.model_construct(**{**row._mapping, "doc_type": DocumentType(row.doc_type)})
+        for row in rows
+    ]
+
+
+async def delete_document_analysis(session: AsyncSession, doc_id: int) -> bool:
+    """Delete a document analysis row by id; the caller commits.
 
     Returns True if a row was deleted, False if it did not exist.
     """
 
-    db: Session = SessionLocal()
-    try:
-        obj = db.query(DocumentAnalysis).filter(DocumentAnalysis.id == doc_id).first()
-        if not obj:
-            return False
-
-        db.delete(obj)
-        db.commit()
-        return True
-    finally:
-        db.close()
+    result = await session.execute(delete(DocumentAnalysis).where(DocumentAnalysis.id == doc_id))
+    return result.rowcount > 0
 
 
-def get_document_detail(doc_id: int) -> DocumentDetail | None:
+async def get_document_detail(session: AsyncSession, doc_id: int) -> DocumentDetail | None:
     """Return a single document analysis including extracted text."""
 
-    db: Session = SessionLocal()
-    try:
-        item = db.query(DocumentAnalysis).filter(DocumentAnalysis.id == doc_id).first()
-        if not item:
-            return None
-
-        return DocumentDetail(
-            id=item.id,
-            filename=item.filename,
-            doc_type=DocumentType(item.doc_type),
-            summary=item.summary,
-            text_length=item.text_length,
-            classification_reason=getattr(item, "classification_reason", None),
-            review_note=getattr(item, "review_note", None),
-            auto_approved=getattr(item, "auto_approved", False),
-            created_at=item.created_at,
-            raw_text=item.raw_text,
-        )
-    finally:
-        db.close()
+    item = await session.get(DocumentAnalysis, doc_id, options=[undefer_group("text")])
+    if not item:
+        return None
+
+    return DocumentDetail(
+        id=item.id,
+        filename=item.filename,
+        doc_type=DocumentType(item.doc_type),
+        summary=item.summary,
+        text_length=item.text_length,
+        classification_reason=getattr(item, "classification_reason", None),
+        review_note=getattr(item, "review_note", None),
+        auto_approved=getattr(item, "auto_approved", False),
+        created_at=item.created_at,
+        raw_text=item.extracted_text,
+    )
 
 
 def get_document_stats() -> dict:
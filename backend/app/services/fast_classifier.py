@@ -0,0 +1,114 @@
+"""
+Fast classifier - route obvious documents without an LLM call.
+
+Scores the text against weighted phrase lists for each document type. When one
+type clearly wins (large relative margin over the runner-up) the caller can use
+it directly and skip the LLM; otherwise it falls through to the LLM classifier.
+"""
+
+import os
+import re
+from collections import Counter
+
+from app.schemas.document import DocumentType
+
+# Only the start of a document is scored; headers and section titles live there.
+SCAN_CHARS = 8000
+# Shorter texts are left to classify_document_type's junk-fax handling.
+MIN_CHARS = 100
+DEFAULT_MIN_MARGIN = 0.8
+# Below this total the text has too few signals to trust either way.
+MIN_SCORE = 6.0
+# A phrase stops adding to the score after this many hits (e.g. "bed" on a census).
+MAX_HITS = 5
+
+_PHRASE_WEIGHTS: dict[DocumentType, dict[str, float]] = {
+    DocumentType.discharge_summary: {
+        "discharge summary": 4.0,
+        "discharge diagnosis": 3.0,
+        "discharge diagnoses": 3.0,
+        "discharge medications": 3.0,
+        "discharge instructions": 2.0,
+        "date of discharge": 3.0,
+        "discharge date": 2.0,
+        "hospital course": 3.0,
+        "discharged home": 2.0,
+        "disposition": 1.0,
+    },
+    DocumentType.inpatient_document: {
+        "progress note": 3.0,
+        "history and physical": 3.0,
+        "h&p": 2.0,
+        "consultation": 2.0,
+        "consult note": 2.0,
+        "history of present illness": 2.0,
+        "assessment and plan": 2.0,
+        "chief complaint": 1.5,
+        "review of systems": 1.5,
+        "physical exam": 1.5,
+        "vital signs": 1.0,
+        "subjective": 1.0,
+        "objective": 1.0,
+    },
+    DocumentType.census: {
+        "census": 4.0,
+        "patient list": 3.0,
+        "admit date": 1.5,
+        "bed": 1.0,
+        "room": 1.0,
+        "unit": 1.0,
+        "mrn": 0.5,
+        "attending": 0.5,
+    },
+}
+
+_PHRASE_TYPES = {
+    phrase: doc_type
+    for doc_type, phrases in _PHRASE_WEIGHTS.items()
+    for phrase in phrases
+}
+
+# One alternation, longest phrases first, so the text is scanned once.
+_PHRASE_RE = re.compile(
+    r"(?<![a-z0-9])("
+    + "|".join(re.escape(p) for p in sorted(_PHRASE_TYPES, key=len, reverse=True))
+    + r")(?![a-z0-9])",
+    re.IGNORECASE,
+)
+
+
+def min_margin() -> float:
+    """Margin above which predictions are trusted (FAST_CLASSIFIER_MARGIN)."""
+    try:
+        return float(os.getenv("FAST_CLASSIFIER_MARGIN") or DEFAULT_MIN_MARGIN)
+    except ValueError:
+        return DEFAULT_MIN_MARGIN
+
+
+def predict(text: str) -> tuple[DocumentType | None, float]:
+    """Return (best_type, margin) for the text.
+
+    margin is (best - runner_up) / best, in [0, 1]. Returns (None, 0.0) when the
+    text is too short or has too few signals to decide.
+    """
+
+    # Only the scanned prefix is ever looked at, so never copy (strip or lower)
+    # the whole text; matches are lowered one by one instead.
+    sample = text[:SCAN_CHARS]
+    if len(sample.strip()) < MIN_CHARS:
+        return (None, 0.0)
+
+    hits = Counter(match.lower() for match in _PHRASE_RE.findall(sample))
+
+    scores: Counter[DocumentType] = Counter()
+    for phrase, count in hits.items():
+        doc_type = _PHRASE_TYPES[phrase]
+        scores[doc_type] += _PHRASE_WEIGHTS[doc_type][phrase] * min(count, MAX_HITS)
+
+    ranked = scores.most_common(2)
+    if not ranked or ranked[0][1] < MIN_SCORE:
+        return (None, 0.0)
+
+    best_type, best = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+    return (best_type, (best - runner_up) / best)
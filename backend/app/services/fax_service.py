@@ -3,15 +3,20 @@ Fax processing service - handles categorization, review, and feedback.
 """
 
 import os
-import json
 import re
 import hashlib
+import base64
+import threading
+import time
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Tuple, List
 from io import BytesIO
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, undefer_group
+from sqlalchemy import func, and_, case, delete, insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
 
 from app.core.db import SessionLocal
 from app.models.fax import Fax, FaxFeedback, FaxSettings, FaxStatus as ModelFaxStatus, FaxCategory as ModelFaxCategory
@@ -20,52 +25,80 @@ from app.schemas.fax import (
     FaxReviewResponse, FaxStats, FaxQueueSummary, FaxFeedbackCreate,
     FaxFeedbackRecord, FaxSettingsResponse
 )
-from app.services.llm_service import generate_text
-from app.services.document_service import extract_text_from_pdf, extract_text_from_tiff
+from app.services import fast_classifier, semcache
+from app.services.llm_service import first_json_object, generate_text
+from app.services.document_service import extract_text_and_page_count, noise_reason
 
 
 # Default settings
 DEFAULT_WATCH_FOLDER = os.environ.get("FAX_WATCH_FOLDER", "./fax_inbox")
 DEFAULT_CONFIDENCE_THRESHOLD = 0.9
 
+# Settings are read for every new fax and by UI polling but change rarely;
+# get_settings serves them from memory for this long (update_settings
+# refreshes them immediately).
+SETTINGS_CACHE_TTL_SECONDS = 30.0
+_settings_cache: dict = {"expires": 0.0, "value": None}
+_settings_lock = threading.Lock()
+
+
+# Stored in Fax.file_hash; changing it would stop existing rows matching as duplicates.
+FILE_HASH_ALGORITHM = "md5"
+
 
 def get_file_hash(file_path: str) -> str:
-    """Calculate MD5 hash of a file to detect duplicates."""
-    hash_md5 = hashlib.md5()
+    """Calculate the hash of a file to detect duplicates, streaming it in blocks.
+
+    Unchanged files (same inode, mtime and size) reuse their earlier hash, so
+    files the watcher retries after a failure are not read again just to hash.
+    """
+    st = os.stat(file_path)
+    return _hash_file(file_path, st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=4096)
+def _hash_file(file_path: str, inode: int, mtime_ns: int, size: int) -> str:
+    # inode/mtime/size are only part of the cache key
     with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
-    return hash_md5.hexdigest()
+        return hashlib.file_digest(f, FILE_HASH_ALGORITHM).hexdigest()
 
 
 def extract_text_from_file(file_path: str) -> Tuple[str, int]:
-    """Extract text from a fax file (PDF or TIFF)."""
-    text = ""
-    page_count = 1
-    
-    with open(file_path, "rb") as f:
-        if file_path.lower().endswith(".pdf"):
-            text = extract_text_from_pdf(f)
-            # Try to get page count
-            try:
-                from pypdf import PdfReader
-                f.seek(0)
-                reader = PdfReader(f)
-                page_count = len(reader.pages)
-            except:
-                pass
-        elif file_path.lower().endswith((".tif", ".tiff")):
-            text = extract_text_from_tiff(f)
-            # Try to get page count from TIFF
-            try:
-                from PIL import Image
-                f.seek(0)
-                img = Image.open(f)
-                page_count = getattr(img, 'n_frames', 1)
-            except:
-                pass
-    
-    return text, page_count
+    """Extract text from a fax file (PDF or TIFF).
+
+    OCR is dispatched to the OCR pool; the calling thread only waits on it.
+    """
+    if file_path.lower().endswith((".pdf", ".tif", ".tiff")):
+        return extract_text_and_page_count(file_path)
+    return "", 1
+
+
+_CATEGORY_BY_NAME = {category.value: category for category in FaxCategory}
+
+
+def _clamp_confidence(conf: object, default: float = 0.5) -> float:
+    """Coerce the model's confidence to a float in [0, 1]."""
+    if not isinstance(conf, (int, float)):
+        return default
+    return 0.0 if conf < 0 else 1.0 if conf > 1 else float(conf)
+
+# JSON schemas for Ollama's structured outputs: the model can only answer
+# with one of the known categories and a confidence in [0, 1].
+_FAX_CATEGORY_PROPERTIES = {
+    "category": {"type": "string", "enum": list(_CATEGORY_BY_NAME)},
+    "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+    "reason": {"type": "string"},
+}
+FAX_CATEGORY_SCHEMA = {
+    "type": "object",
+    "properties": _FAX_CATEGORY_PROPERTIES,
+    "required": ["category", "confidence", "reason"],
+}
+FAX_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {**_FAX_CATEGORY_PROPERTIES, "summary": {"type": "string"}},
+    "required": ["category", "confidence", "reason", "summary"],
+}
 
 
 def categorize_fax(text: str) -> Tuple[FaxCategory, float, str]:
@@ -75,6 +108,9 @@ def categorize_fax(text: str) -> Tuple[FaxCategory, float, str]:
     """
     if not text or len(text.strip()) < 50:
         return (FaxCategory.junk_fax, 0.3, "Insufficient text to categorize.")
+    reason = noise_reason(text)
+    if reason:
+        return (FaxCategory.junk_fax, 0.3, reason)
 
     snippet = text[:4000]  # Limit text sent to LLM
 
@@ -94,45 +130,28 @@ Fax Document:
 {snippet}
 """
 
-    raw = generate_text(prompt, max_tokens=200).strip()
+    raw = generate_text(prompt, max_tokens=200, schema=FAX_CATEGORY_SCHEMA).strip()
 
     # Try to parse JSON response
     category = FaxCategory.junk_fax
     confidence = 0.5
     reason = "Unable to determine category"
 
-    match = re.search(r"\{.*\}", raw, flags=re.DOTALL)
-    if match:
-        try:
-            payload = json.loads(match.group(0))
-            if isinstance(payload, dict):
-                cat_str = str(payload.get("category", "")).strip().lower()
-                conf = payload.get("confidence", 0.5)
-                reason = str(payload.get("reason", "")).strip() or reason
-
-                # Map category string to enum
-                category_map = {
-                    "discharge_summary": FaxCategory.discharge_summary,
-                    "inpatient_document": FaxCategory.inpatient_document,
-                    "census": FaxCategory.census,
-                    "junk_fax": FaxCategory.junk_fax,
-                }
-
-                if cat_str in category_map:
-                    category = category_map[cat_str]
-
-                if isinstance(conf, (int, float)):
-                    confidence = max(0.0, min(1.0, float(conf)))
-
-        except (json.JSONDecodeError, KeyError):
-            pass
+    payload = first_json_object(raw)
+    if payload is not None:
+        cat_str = str(payload.get("category", "")).strip().lower()
+        conf = payload.get("confidence", 0.5)
+        reason = str(payload.get("reason", "")).strip() or reason
+
+        category = _CATEGORY_BY_NAME.get(cat_str, category)
+        confidence = _clamp_confidence(conf, confidence)
 
     return (category, confidence, reason)
 
 
 def summarize_fax(text: str, max_tokens: int = 200) -> str:
     """Generate a brief summary of the fax content."""
-    if not text or len(text.strip()) < 50:
+    if not text or len(text.strip()) < 50 or noise_reason(text):
         return "Insufficient text to summarize."
 
     snippet = text[:3000]
@@ -150,6 +169,62 @@ Summary:"""
     return generate_text(prompt, max_tokens=max_tokens)
 
 
+def analyze_fax(text: str) -> Tuple[FaxCategory, float, str, str]:
+    """
+    Categorize and summarize a fax with a single LLM call.
+    Returns (category, confidence, reason, summary). Falls back to
+    categorize_fax + summarize_fax if the model's JSON is unusable.
+    """
+    if not text or len(text.strip()) < 50 or noise_reason(text):
+        # categorize_fax / summarize_fax answer these without the LLM
+        return (*categorize_fax(text), summarize_fax(text))
+
+    snippet = text[:4000]  # Limit text sent to LLM
+
+    prompt = f"""You are a clinical documentation classifier. Analyze the following fax document and categorize it into ONE of these categories:
+
+- discharge_summary: Patient discharge summaries from hospital stays
+- inpatient_document: Inpatient progress notes, H&P, consults, and other in-hospital documentation
+- census: Patient census lists with bed numbers, units, or service names
+- junk_fax: Non-clinical documents, scanning errors, or spam faxes
+
+Also assess your confidence level (0.0 to 1.0) in this categorization.
+
+Then summarize the fax in 2-3 sentences. Focus on:
+- Who sent it / who it's about
+- Main purpose or request
+- Any urgent items or deadlines
+
+Return STRICT JSON with exactly these keys:
+{{"category": "discharge_summary|inpatient_document|census|junk_fax", "confidence": 0.85, "reason": "Brief explanation", "summary": "..."}}
+
+Fax Document:
+{snippet}
+"""
+
+    raw = generate_text(prompt, max_tokens=350, schema=FAX_ANALYSIS_SCHEMA)
+
+    payload = first_json_object(raw) or {}
+    cat_str = str(payload.get("category", "")).strip().lower()
+    summary = str(payload.get("summary") or "").strip()
+    if cat_str not in _CATEGORY_BY_NAME or not summary:
+        return (*categorize_fax(text), summarize_fax(text))
+
+    conf = payload.get("confidence", 0.5)
+    confidence = _clamp_confidence(conf)
+    reason = str(payload.get("reason", "")).strip() or "Unable to determine category"
+
+    return (_CATEGORY_BY_NAME[cat_str], confidence, reason, summary)
+
+
+# Matched as substrings (so "stat" also hits "status"), in one pass over the text.
+URGENT_KEYWORDS = (
+    "urgent", "asap", "immediately", "emergency", "stat",
+    "critical", "time-sensitive", "rush", "priority"
+)
+_URGENT_KEYWORD_RE = re.compile("|".join(map(re.escape, URGENT_KEYWORDS)), re.IGNORECASE)
+
+
 def detect_urgency(text: str, category: FaxCategory) -> Tuple[bool, int]:
     """
     Detect if a fax is urgent based on content and category.
@@ -159,19 +234,10 @@ def detect_urgency(text: str, category: FaxCategory) -> Tuple[bool, int]:
     is_urgent = False
     priority = 0
 
-    text_lower = text.lower()
-
     # Check for urgent keywords
-    urgent_keywords = [
-        "urgent", "asap", "immediately", "emergency", "stat",
-        "critical", "time-sensitive", "rush", "priority"
-    ]
-
-    for keyword in urgent_keywords:
-        if keyword in text_lower:
-            is_urgent = True
-            priority = max(priority, 75)
-            break
+    if _URGENT_KEYWORD_RE.search(text):
+        is_urgent = True
+        priority = max(priority, 75)
 
     # Higher priority for certain categories
     if category == FaxCategory.discharge_summary:
@@ -182,34 +248,70 @@ def detect_urgency(text: str, category: FaxCategory) -> Tuple[bool, int]:
     return (is_urgent, priority)
 
 
-def process_new_fax(file_path: str, filename: str) -> Optional[FaxRecord]:
+def process_new_fax(
+    file_path: str,
+    filename: str,
+    file_hash: Optional[str] = None,
+    original_path: Optional[str] = None,
+) -> Optional[FaxRecord]:
     """
     Process a new fax file: extract text, categorize, and save to database.
+
+    Pass file_hash (FILE_HASH_ALGORITHM hex digest) if it was already computed while the file
+    was written, to avoid re-reading it. original_path is the path recorded on the fax if
+    file_path is a temporary name (e.g. the folder watcher's claimed copy).
     """
     db: Session = SessionLocal()
     try:
         # Check for duplicates by file hash
-        file_hash = get_file_hash(file_path)
-        existing = db.query(Fax).filter(Fax.file_hash == file_hash).first()
+        if file_hash is None:
+            file_hash = get_file_hash(file_path)
+        # Index-only probe; duplicates skip OCR and the LLM entirely
+        existing = db.query(Fax.id).filter(Fax.file_hash == file_hash).first()
         if existing:
             return None  # Duplicate file
 
         # Extract text
         text, page_count = extract_text_from_file(file_path)
 
-        # Categorize with LLM
-        category, confidence, reason = categorize_fax(text)
+        # Obvious faxes are categorized by keywords and only need a summary;
+        # the rest get category and summary from one LLM call. Near-duplicates
+        # reuse cached categories, but summaries describe the patient and are
+        # only reused for the exact same text.
+        analysis: list = []
+
+        def categorize() -> Tuple[FaxCategory, float, str]:
+            analysis.append(analyze_fax(text))
+            return analysis[0][:3]
+
+        def summarize() -> str:
+            return analysis[0][3] if analysis else summarize_fax(text)
+
+        fast_type, margin = fast_classifier.predict(text)
+        keyword_routed = fast_type is not None and margin >= fast_classifier.min_margin()
+        if keyword_routed:
+            category = FaxCategory(fast_type.value)
+            confidence = margin
+            reason = f"Keyword match for {fast_type.value} (margin {margin:.2f})."
+        else:
+            category, confidence, reason = semcache.get_or_compute(text, "fax_category", categorize)
+            category = FaxCategory(category)
+        summary = semcache.get_or_compute(text, "fax_document_summary", summarize, semantic=False)
 
         # Detect urgency
         is_urgent, priority = detect_urgency(text, category)
 
-        # Generate summary
-        summary = summarize_fax(text)
-
         # Determine status based on confidence and settings
-        # Auto-approve if confidence >= threshold and auto_process is enabled
+        # Auto-approve if confidence >= threshold and auto_process is enabled.
+        # A keyword margin is not a calibrated probability (it is 1.0 whenever
+        # only one category matches, even for junk mentioning "census"), so
+        # keyword-routed faxes always go to review.
         settings = get_settings()
-        is_auto_approved = confidence >= settings.confidence_threshold and not settings.require_review
+        is_auto_approved = (
+            not keyword_routed
+            and confidence >= settings.confidence_threshold
+            and not settings.require_review
+        )
         
         if is_auto_approved:
             initial_status = FaxStatus.approved.value
@@ -227,13 +329,13 @@ def process_new_fax(file_path: str, filename: str) -> Optional[FaxRecord]:
         # Create fax record
         fax = Fax(
             filename=filename,
-            original_path=file_path,
+            original_path=original_path or file_path,
             file_hash=file_hash,
             status=initial_status,
             ai_category=category.value,
             ai_confidence=confidence,
             ai_reason=reason,
-            raw_text=text,
+            extracted_text=text,
             text_length=len(text),
             summary=summary,
             page_count=page_count,
@@ -251,27 +353,12 @@ def process_new_fax(file_path: str, filename: str) -> Optional[FaxRecord]:
         db.commit()
         db.refresh(fax)
 
-        return FaxRecord(
-            id=fax.id,
-            filename=fax.filename,
-            status=FaxStatus(fax.status),
-            ai_category=FaxCategory(fax.ai_category) if fax.ai_category else None,
-            ai_confidence=fax.ai_confidence,
-            ai_reason=fax.ai_reason,
-            final_category=FaxCategory(fax.final_category) if fax.final_category else None,
-            was_overridden=fax.was_overridden,
-            is_urgent=fax.is_urgent,
-            priority_score=fax.priority_score,
-            text_length=fax.text_length,
-            page_count=fax.page_count,
-            summary=fax.summary,
-            received_at=fax.received_at,
-            processed_at=fax.processed_at,
-            reviewed_at=fax.reviewed_at,
-            reviewed_by=fax.reviewed_by,
-            created_at=fax.created_at,
-        )
+        return FaxRecord.model_validate(fax)
 
+    except IntegrityError:
+        # The same file was ingested concurrently and committed first (unique file_hash)
+        db.rollback()
+        return None
     except Exception as e:
         db.rollback()
         raise e
@@ -279,92 +366,106 @@ def process_new_fax(file_path: str, filename: str) -> Optional[FaxRecord]:
         db.close()
 
 
-def list_faxes(
+# Columns needed for FaxRecord; raw_text is deliberately left out.
+_FAX_RECORD_COLUMNS = (
+    Fax.id,
+    Fax.filename,
+    Fax.status,
+    Fax.ai_category,
+    Fax.ai_confidence,
+    Fax.ai_reason,
+    Fax.final_category,
+    Fax.was_overridden,
+    Fax.is_urgent,
+    Fax.priority_score,
+    Fax.text_length,
+    Fax.page_count,
+    Fax.summary,
+    Fax.received_at,
+    Fax.processed_at,
+    Fax.reviewed_at,
+    Fax.reviewed_by,
+    Fax.created_at,
+)
+
+
+def encode_fax_cursor(record: FaxRecord) -> str:
+    """Build the opaque cursor for the page that starts after ``record``."""
+    raw = f"{record.priority_score},{record.received_at.isoformat()},{record.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_fax_cursor(cursor: str) -> Tuple[int, datetime, int]:
+    try:
+        priority, received_at, fax_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(",")
+        return int(priority), datetime.fromisoformat(received_at), int(fax_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+async def list_faxes(
+    session: AsyncSession,
     status: Optional[FaxStatus] = None,
     category: Optional[FaxCategory] = None,
     urgent_only: bool = False,
     limit: int = 50,
-    offset: int = 0
+    cursor: Optional[str] = None
 ) -> List[FaxRecord]:
-    """List faxes with optional filtering."""
-    db: Session = SessionLocal()
-    try:
-        query = db.query(Fax)
-
-        if status:
-            query = query.filter(Fax.status == status.value)
-        if category:
-            query = query.filter(
-                (Fax.ai_category == category.value) | 
-                (Fax.final_category == category.value)
-            )
-        if urgent_only:
-            query = query.filter(Fax.is_urgent == True)
-
-        # Order by priority (urgent first), then by received date
-        query = query.order_by(Fax.priority_score.desc(), Fax.received_at.desc())
-        query = query.offset(offset).limit(limit)
-
-        faxes = query.all()
-
-        return [
-            FaxRecord(
-                id=f.id,
-                filename=f.filename,
-                status=FaxStatus(f.status),
-                ai_category=FaxCategory(f.ai_category) if f.ai_category else None,
-                ai_confidence=f.ai_confidence,
-                ai_reason=f.ai_reason,
-                final_category=FaxCategory(f.final_category) if f.final_category else None,
-                was_overridden=f.was_overridden,
-                is_urgent=f.is_urgent,
-                priority_score=f.priority_score,
-                text_length=f.text_length,
-                page_count=f.page_count,
-                summary=f.summary,
-                received_at=f.received_at,
-                processed_at=f.processed_at,
-                reviewed_at=f.reviewed_at,
-                reviewed_by=f.reviewed_by,
-                created_at=f.created_at,
-            )
-            for f in faxes
-        ]
-    finally:
-        db.close()
+    """List faxes with optional filtering.
+
+    Pages with a keyset cursor (see ``encode_fax_cursor``) rather than OFFSET,
+    so later pages cost the same as the first. Raises ValueError for a bad cursor.
+    """
+    after = _decode_fax_cursor(cursor) if cursor else None
+
+    query = select(*_FAX_RECORD_COLUMNS)
+
+    if status:
+        query = query.where(Fax.status == status.value)
+    if category:
+        query = query.where(
+            (Fax.ai_category == category.value) | 
+            (Fax.final_category == category.value)
+        )
+    if urgent_only:
+        query = query.where(Fax.is_urgent == True)
+
+    if after:
+        query = query.where(tuple_(Fax.priority_score, Fax.received_at, Fax.id) < after)
+
+    # Order by priority (urgent first), then by received date
+    query = query.order_by(Fax.priority_score.desc(), Fax.received_at.desc(), Fax.id.desc())
+    query = query.limit(limit)
+
+    rows = await session.execute(query)
+    return [_fax_record(row) for row in rows]
+
+
+def _fax_record(row) -> FaxRecord:
+    """Build a FaxRecord from a _FAX_RECORD_COLUMNS row without re-validating it.
+
+    model_construct skips coercion, so the enum columns (stored as plain
+    strings) are converted here; the other columns are already typed.
+    """
+    values = dict(row._mapping)
+    values["status"] = FaxStatus(values["status"])
+    for field in ("ai_category", "final_category"):
+        if values[field]:
+            values[field] = FaxCategory(values[field])
+    return FaxRecord.model_construct(**values)
 
 
 def get_fax_detail(fax_id: int) -> Optional[FaxDetail]:
     """Get full details of a fax including extracted text."""
     db: Session = SessionLocal()
     try:
-        fax = db.query(Fax).filter(Fax.id == fax_id).first()
+        fax = db.query(Fax).options(undefer_group("text")).filter(Fax.id == fax_id).first()
         if not fax:
             return None
 
-        return FaxDetail(
-            id=fax.id,
-            filename=fax.filename,
-            original_path=fax.original_path,
-            status=FaxStatus(fax.status),
-            ai_category=FaxCategory(fax.ai_category) if fax.ai_category else None,
-            ai_confidence=fax.ai_confidence,
-            ai_reason=fax.ai_reason,
-            final_category=FaxCategory(fax.final_category) if fax.final_category else None,
-            was_overridden=fax.was_overridden,
-            override_reason=fax.override_reason,
-            is_urgent=fax.is_urgent,
-            priority_score=fax.priority_score,
-            text_length=fax.text_length,
-            page_count=fax.page_count,
-            summary=fax.summary,
-            raw_text=fax.raw_text,
-            received_at=fax.received_at,
-            processed_at=fax.processed_at,
-            reviewed_at=fax.reviewed_at,
-            reviewed_by=fax.reviewed_by,
-            created_at=fax.created_at,
-        )
+        detail = FaxDetail.model_validate(fax)
+        detail.raw_text = fax.extracted_text
+        return detail
     finally:
         db.close()
 
@@ -428,34 +529,78 @@ def review_fax(fax_id: int, request: FaxReviewRequest) -> Optional[FaxReviewResp
         db.close()
 
 
+# Keeps IN (...) lists well under SQLite's bound-parameter limit.
+BATCH_CHUNK_SIZE = 500
+
+
 def batch_review_faxes(
+    session: Session,
     fax_ids: List[int],
     action: str,
     category: Optional[FaxCategory] = None,
     reason: Optional[str] = None,
     reviewer: Optional[str] = None
 ) -> Tuple[int, int]:
-    """Batch review multiple faxes. Returns (processed_count, failed_count)."""
-    processed = 0
-    failed = 0
+    """Batch review multiple faxes. Returns (processed_count, failed_count).
 
-    for fax_id in fax_ids:
-        try:
-            request = FaxReviewRequest(
-                action=action,
-                category=category,
-                reason=reason,
-                reviewer=reviewer,
+    Runs inside the caller's transaction: the caller owns ``session`` and
+    commits once for the whole batch. IDs that don't exist count as failed.
+    """
+    if action == "override" and not category:
+        raise ValueError("Category is required for override action")
+
+    now = datetime.utcnow()
+    unique_ids = list(dict.fromkeys(fax_ids))
+    found: set[int] = set()
+
+    for i in range(0, len(unique_ids), BATCH_CHUNK_SIZE):
+        chunk = unique_ids[i:i + BATCH_CHUNK_SIZE]
+
+        rows = session.execute(
+            select(Fax.id, Fax.ai_category).where(Fax.id.in_(chunk))
+        ).all()
+        if not rows:
+            continue
+        found.update(row.id for row in rows)
+        chunk_found = [row.id for row in rows]
+
+        if action == "approve":
+            values = {
+                "status": FaxStatus.approved.value,
+                "final_category": Fax.ai_category,
+                "was_overridden": False,
+            }
+        else:  # override
+            # Record feedback for learning
+            session.execute(
+                insert(FaxFeedback),
+                [
+                    {
+                        "fax_id": row.id,
+                        "ai_category": row.ai_category,
+                        "correct_category": category.value,
+                        "feedback_text": reason,
+                        "submitted_by": reviewer,
+                    }
+                    for row in rows
+                ],
             )
-            result = review_fax(fax_id, request)
-            if result:
-                processed += 1
-            else:
-                failed += 1
-        except Exception:
-            failed += 1
+            values = {
+                "status": FaxStatus.overridden.value,
+                "final_category": category.value,
+                "was_overridden": True,
+                "override_reason": reason,
+            }
+
+        session.execute(
+            update(Fax)
+            .where(Fax.id.in_(chunk_found))
+            .values(reviewed_by=reviewer, reviewed_at=now, updated_at=now, **values)
+            .execution_options(synchronize_session=False)
+        )
 
-    return (processed, failed)
+    processed = sum(1 for fax_id in fax_ids if fax_id in found)
+    return (processed, len(fax_ids) - processed)
 
 
 def mark_fax_processed(fax_id: int) -> bool:
@@ -478,20 +623,32 @@ def get_fax_stats() -> FaxStats:
     """Get statistics about fax processing."""
     db: Session = SessionLocal()
     try:
-        total = db.query(func.count(Fax.id)).scalar() or 0
-
-        # Status counts
-        status_counts = dict(
-            db.query(Fax.status, func.count(Fax.id))
-            .group_by(Fax.status)
-            .all()
-        )
+        now = datetime.utcnow()
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        week_start = today_start - timedelta(days=7)
 
-        pending = status_counts.get(FaxStatus.pending.value, 0)
-        categorized = status_counts.get(FaxStatus.categorized.value, 0)
-        approved = status_counts.get(FaxStatus.approved.value, 0)
-        overridden = status_counts.get(FaxStatus.overridden.value, 0)
-        processed = status_counts.get(FaxStatus.processed.value, 0)
+        # Status, auto-approval and recent-activity counts in one pass over the table
+        (
+            total,
+            pending,
+            categorized,
+            approved,
+            overridden,
+            processed,
+            auto_approved_count,
+            processed_today,
+            processed_this_week,
+        ) = db.query(
+            func.count(Fax.id),
+            func.count(case((Fax.status == FaxStatus.pending.value, 1))),
+            func.count(case((Fax.status == FaxStatus.categorized.value, 1))),
+            func.count(case((Fax.status == FaxStatus.approved.value, 1))),
+            func.count(case((Fax.status == FaxStatus.overridden.value, 1))),
+            func.count(case((Fax.status == FaxStatus.processed.value, 1))),
+            func.count(case((Fax.auto_approved == True, 1))),
+            func.count(case((Fax.reviewed_at >= today_start, 1))),
+            func.count(case((Fax.reviewed_at >= week_start, 1))),
+        ).one()
 
         # Category counts (using final_category where available)
         category_counts = {}
@@ -508,24 +665,6 @@ def get_fax_stats() -> FaxStats:
         total_reviewed = approved + overridden
         accuracy_rate = (approved / total_reviewed * 100) if total_reviewed > 0 else 0.0
 
-        # Recent activity
-        now = datetime.utcnow()
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        week_start = today_start - timedelta(days=7)
-
-        processed_today = db.query(func.count(Fax.id)).filter(
-            Fax.reviewed_at >= today_start
-        ).scalar() or 0
-
-        processed_this_week = db.query(func.count(Fax.id)).filter(
-            Fax.reviewed_at >= week_start
-        ).scalar() or 0
-
-        # Count auto-approved faxes
-        auto_approved_count = db.query(func.count(Fax.id)).filter(
-            Fax.auto_approved == True
-        ).scalar() or 0
-
         return FaxStats(
             total_faxes=total,
             pending=pending,
@@ -571,19 +710,16 @@ def get_queue_summary() -> FaxQueueSummary:
             Fax.reviewed_at >= today_start
         ).scalar() or 0
 
-        # Calculate average processing time
-        avg_time = None
-        reviewed_faxes = db.query(
+        # Average processing time, converted from days to minutes in SQL
+        # (NULL, i.e. None, when nothing has been reviewed yet)
+        avg_time = db.query(
             func.avg(
                 func.julianday(Fax.reviewed_at) - func.julianday(Fax.received_at)
-            )
+            ) * 24 * 60
         ).filter(
             Fax.reviewed_at.isnot(None)
         ).scalar()
 
-        if reviewed_faxes:
-            avg_time = reviewed_faxes * 24 * 60  # Convert days to minutes
-
         return FaxQueueSummary(
             pending_review=pending_review,
             urgent_count=urgent_count,
@@ -631,7 +767,18 @@ def submit_feedback(feedback: FaxFeedbackCreate) -> FaxFeedbackRecord:
 
 
 def get_settings() -> FaxSettingsResponse:
-    """Get current fax processing settings."""
+    """Get current fax processing settings (cached for SETTINGS_CACHE_TTL_SECONDS)."""
+    with _settings_lock:
+        if time.monotonic() < _settings_cache["expires"]:
+            return _settings_cache["value"]
+
+        value = _load_settings()
+        _settings_cache["value"] = value
+        _settings_cache["expires"] = time.monotonic() + SETTINGS_CACHE_TTL_SECONDS
+        return value
+
+
+def _load_settings() -> FaxSettingsResponse:
     db: Session = SessionLocal()
     try:
         settings = {
@@ -686,6 +833,8 @@ def update_settings(updates: dict) -> FaxSettingsResponse:
                     db.add(FaxSettings(key=key, value=str_value))
         
         db.commit()
+        with _settings_lock:
+            _settings_cache["expires"] = 0.0
         return get_settings()
     finally:
         db.close()
@@ -695,13 +844,14 @@ def delete_fax(fax_id: int) -> bool:
     """Delete a fax record."""
     db: Session = SessionLocal()
     try:
-        fax = db.query(Fax).filter(Fax.id == fax_id).first()
-        if not fax:
+        # Plain DELETE ... WHERE statements: no SELECT, no ORM object loaded.
+        deleted = db.execute(delete(Fax).where(Fax.id == fax_id)).rowcount
+        if not deleted:
+            db.rollback()
             return False
-        
+
         # Also delete related feedback
-        db.query(FaxFeedback).filter(FaxFeedback.fax_id == fax_id).delete()
-        db.delete(fax)
+        db.execute(delete(FaxFeedback).where(FaxFeedback.fax_id == fax_id))
         db.commit()
         return True
     finally:
@@ -3,28 +3,107 @@ Folder watcher service - monitors shared folder for new fax files.
 """
 
 import os
+import shutil
+import socket
 import time
 import threading
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Callable
-from dataclasses import dataclass, field
+from typing import Optional, List, Callable, Dict, Tuple
+from dataclasses import dataclass, replace
+
+import watchfiles
+
+try:
+    import fcntl
+except ImportError:  # Windows: an open file is detected by the open() check alone
+    fcntl = None
 
 from app.services.fax_service import process_new_fax, get_settings
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CONCURRENCY = 4
+
+# A file being processed is renamed to f"{CLAIM_PREFIX}{host}@{pid}_{name}"
+# first, so only one watcher (process or replica sharing the folder) can take
+# it. "@" cannot appear in a hostname, so the host part parses unambiguously.
+CLAIM_PREFIX = ".inprogress_"
+CLAIM_HOST = socket.gethostname().lower()
+
+# Filesystems where change notifications are unreliable (events from other
+# clients are not delivered); folders on these are polled every scan_interval.
+NETWORK_FILESYSTEMS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "fuse.sshfs"}
+
+
+def _default_concurrency() -> int:
+    """Files processed at once per scan (FAX_WATCHER_CONCURRENCY, default 4)."""
+    try:
+        return max(1, int(os.getenv("FAX_WATCHER_CONCURRENCY") or DEFAULT_CONCURRENCY))
+    except ValueError:
+        return DEFAULT_CONCURRENCY
 
-@dataclass
+
+def _pid_running(pid: int) -> bool:
+    """True if a process with this pid is running on this host."""
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":
+        import ctypes
+        
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return ctypes.get_last_error() == 5  # ERROR_ACCESS_DENIED: exists, not ours
+        try:
+            exit_code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+                return True
+            return exit_code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _is_network_filesystem(path: Path) -> bool:
+    """True if path is on a network mount according to /proc/mounts (Linux only)."""
+    try:
+        with open("/proc/mounts") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+
+    # The longest mount point containing the path is the one it lives on.
+    resolved = str(path.resolve())
+    fstype, longest = "", -1
+    for mount_point, mount_type in mounts:
+        mount_point = mount_point.replace("\\040", " ")  # spaces are octal-escaped
+        inside = resolved == mount_point or resolved.startswith(mount_point.rstrip("/") + "/")
+        if inside and len(mount_point) > longest:
+            fstype, longest = mount_type, len(mount_point)
+    return fstype in NETWORK_FILESYSTEMS
+
+
+@dataclass(frozen=True)
 class WatcherState:
-    """State of the folder watcher."""
+    """Snapshot of the folder watcher's state.
+    
+    Never mutated: the watcher swaps in a new snapshot on every change, so
+    readers (e.g. the status endpoint) get a consistent view without locking.
+    """
     is_running: bool = False
     watch_folder: str = ""
     last_scan_at: Optional[datetime] = None
     files_in_queue: int = 0
-    processed_files: set = field(default_factory=set)
-    errors: List[str] = field(default_factory=list)
+    errors: Tuple[str, ...] = ()
     currently_processing_file: Optional[str] = None
 
 
@@ -33,37 +112,95 @@ class FaxFolderWatcher:
     Watches a shared folder for new fax files and processes them automatically.
     """
     
-    SUPPORTED_EXTENSIONS = {'.pdf', '.tif', '.tiff'}
+    SUPPORTED_EXTENSIONS = frozenset({'.pdf', '.tif', '.tiff'})
+    # A file is processed once its (inode, mtime, size) has been unchanged this long.
+    DEBOUNCE_SECONDS = 2.0
+    # While change notifications are active the folder is still rescanned, in
+    # case an event was missed: every EVENT_RESCAN_SECONDS after activity,
+    # backing off by EVENT_RESCAN_BACKOFF per quiet rescan up to the maximum.
+    EVENT_RESCAN_SECONDS = 60
+    EVENT_RESCAN_MAX_SECONDS = 300
+    EVENT_RESCAN_BACKOFF = 1.5
+    # Directory mtimes this recent may hide a later change on filesystems with
+    # coarse timestamps (FAT: 2 s), so such folders are always listed.
+    DIR_MTIME_GRANULARITY_NS = 2_000_000_000
+    # A file whose processing failed is retried after RETRY_BASE_SECONDS,
+    # doubling per consecutive failure up to RETRY_MAX_SECONDS, unless the
+    # file itself changes (e.g. it is replaced with a fixed copy).
+    RETRY_BASE_SECONDS = 30
+    RETRY_MAX_SECONDS = 900
+    # Change events for a file the watcher itself renamed back into the folder
+    # are ignored for this long.
+    OWN_RENAME_QUIET_SECONDS = 5.0
     
-    def __init__(self, watch_folder: Optional[str] = None, scan_interval: int = 10):
+    def __init__(
+        self,
+        watch_folder: Optional[str] = None,
+        scan_interval: int = 10,
+        concurrency: Optional[int] = None,
+    ):
         """
         Initialize the folder watcher.
         
         Args:
             watch_folder: Path to the folder to watch. If None, uses settings.
-            scan_interval: How often to scan the folder (in seconds).
+            scan_interval: How often to scan the folder (in seconds) when
+                change notifications are unavailable (e.g. network shares).
+            concurrency: How many files to process at once. OCR runs in the
+                shared OCR pool, so this mostly overlaps the LLM calls.
+                If None, uses FAX_WATCHER_CONCURRENCY (default 4).
         """
         self.scan_interval = scan_interval
+        self.concurrency = concurrency or _default_concurrency()
         self._state = WatcherState()
+        self._state_lock = threading.Lock()
+        # Files already handled but still in the folder (e.g. duplicates, or
+        # files that could not be moved); pruned to what is present each scan.
+        self._processed_files: set = set()
         self._thread: Optional[threading.Thread] = None
+        self._event_thread: Optional[threading.Thread] = None
+        # True while the event thread is receiving change notifications.
+        self._events_active = False
         self._stop_event = threading.Event()
+        # Set to cut the current wait short (stop or manual scan).
+        self._wake_event = threading.Event()
         self._callbacks: List[Callable] = []
+        # Files seen but not yet stable: path -> ((inode, mtime_ns, size), first seen at)
+        self._pending: Dict[str, Tuple[Tuple[int, int, int], float]] = {}
+        # Files whose processing failed: path -> (signature at failure, attempts, retry at)
+        self._failures: Dict[str, Tuple[Tuple[int, int, int], int, float]] = {}
+        # Paths the watcher renamed back itself: path -> ignore change events until
+        self._own_renames: Dict[str, float] = {}
+        # processed/ subfolder, once it is known to exist
+        self._processed_folder: Optional[Path] = None
+        # Watch folder mtime as of the last full listing (see _scan_folder)
+        self._listed_dir_mtime_ns: Optional[int] = None
         
         # Set watch folder from parameter or settings
         if watch_folder:
-            self._state.watch_folder = watch_folder
+            self._update_state(watch_folder=watch_folder)
         else:
             try:
                 settings = get_settings()
-                self._state.watch_folder = settings.watch_folder
+                self._update_state(watch_folder=settings.watch_folder)
             except:
-                self._state.watch_folder = os.environ.get("FAX_WATCH_FOLDER", "./fax_inbox")
+                self._update_state(watch_folder=os.environ.get("FAX_WATCH_FOLDER", "./fax_inbox"))
     
     @property
     def state(self) -> WatcherState:
-        """Get current watcher state."""
+        """Get the current watcher state snapshot."""
         return self._state
     
+    def _update_state(self, **changes) -> None:
+        """Publish a new state snapshot with the given fields changed."""
+        with self._state_lock:
+            self._state = replace(self._state, **changes)
+    
+    def _record_error(self, error_msg: str) -> None:
+        """Add an error to the state, keeping only the last 10."""
+        with self._state_lock:
+            self._state = replace(self._state, errors=(self._state.errors + (error_msg,))[-10:])
+    
     @property
     def is_running(self) -> bool:
         """Check if watcher is running."""
@@ -88,13 +225,25 @@ class FaxFolderWatcher:
             except Exception as e:
                 error_msg = f"Failed to create watch folder: {e}"
                 logger.error(error_msg)
-                self._state.errors.append(error_msg)
+                self._record_error(error_msg)
                 return
         
+        self._release_stale_claims(watch_path)
+        
         self._stop_event.clear()
+        if _is_network_filesystem(watch_path):
+            logger.info(f"{watch_path} is a network share; polling every {self.scan_interval}s")
+        else:
+            # Set before the thread runs so the first wait already uses the
+            # rescan interval; the thread clears it if notifications fail.
+            self._events_active = True
+            self._event_thread = threading.Thread(
+                target=self._event_loop, args=(watch_path,), name="fax-watcher-events", daemon=True
+            )
+            self._event_thread.start()
         self._thread = threading.Thread(target=self._watch_loop, daemon=True)
         self._thread.start()
-        self._state.is_running = True
+        self._update_state(is_running=True)
         logger.info(f"Started watching folder: {self._state.watch_folder}")
     
     def stop(self):
@@ -103,87 +252,235 @@ class FaxFolderWatcher:
             return
         
         self._stop_event.set()
+        self._wake_event.set()
         if self._thread:
             self._thread.join(timeout=5)
-        self._state.is_running = False
+        if self._event_thread:
+            self._event_thread.join(timeout=5)
+        self._update_state(is_running=False)
         logger.info("Stopped folder watcher")
     
     def _watch_loop(self):
         """Main watch loop that runs in background thread."""
+        rescan_interval = self.EVENT_RESCAN_SECONDS
         while not self._stop_event.is_set():
+            self._wake_event.clear()
             try:
                 self._scan_folder()
             except Exception as e:
                 error_msg = f"Error during folder scan: {e}"
                 logger.error(error_msg)
-                self._state.errors.append(error_msg)
-                # Keep only last 10 errors
-                self._state.errors = self._state.errors[-10:]
+                self._record_error(error_msg)
             
-            # Wait for next scan interval
-            self._stop_event.wait(self.scan_interval)
+            # Wait for the next change notification (or poll interval); come
+            # back sooner to pick up files waiting out the debounce window.
+            # Polling (no notifications) keeps the fixed scan_interval, since
+            # it is the only way new files are noticed.
+            timeout = rescan_interval if self._events_active else self.scan_interval
+            if self._has_unsettled_files():
+                timeout = min(timeout, self.DEBOUNCE_SECONDS)
+            retry_in = self._seconds_until_retry()
+            if retry_in is not None:
+                timeout = min(timeout, retry_in)
+            if self._wake_event.wait(timeout):
+                rescan_interval = self.EVENT_RESCAN_SECONDS
+            elif timeout == rescan_interval:
+                rescan_interval = min(rescan_interval * self.EVENT_RESCAN_BACKOFF, self.EVENT_RESCAN_MAX_SECONDS)
+    
+    def _event_loop(self, watch_path: Path):
+        """Wake the watch loop whenever a supported file is added or modified."""
+        try:
+            for _ in watchfiles.watch(
+                watch_path,
+                watch_filter=self._is_candidate_change,
+                stop_event=self._stop_event,
+                recursive=False,
+                raise_interrupt=False,
+            ):
+                self._wake_event.set()
+        except Exception as e:
+            logger.warning(f"Change notifications unavailable for {watch_path}, polling instead: {e}")
+        finally:
+            self._events_active = False
+            # Let the watch loop pick up the polling interval right away.
+            self._wake_event.set()
+    
+    def _is_candidate_change(self, change: watchfiles.Change, path: str) -> bool:
+        if change == watchfiles.Change.deleted or not self._is_candidate_name(os.path.basename(path)):
+            return False
+        quiet_until = self._own_renames.get(os.path.abspath(path))
+        return quiet_until is None or time.monotonic() >= quiet_until
+    
+    def _is_candidate_name(self, name: str) -> bool:
+        """True for supported fax files, judged by name alone (no Path parsing)."""
+        # Hidden files and Office lock files are temporary copies, never faxes.
+        if name.startswith(('.', '~$')):
+            return False
+        dot = name.rfind('.')
+        return dot > 0 and name[dot:].lower() in self.SUPPORTED_EXTENSIONS
     
     def _scan_folder(self):
         """Scan the watch folder for new files."""
         watch_path = Path(self._state.watch_folder)
         
-        if not watch_path.exists():
+        try:
+            dir_mtime_ns = watch_path.stat().st_mtime_ns
+        except OSError:
             return
         
-        self._state.last_scan_at = datetime.utcnow()
+        self._update_state(last_scan_at=datetime.utcnow())
+        
+        # Adding, renaming or removing a file bumps the folder's mtime, so if it
+        # is unchanged and no file is waiting to settle (or to be retried after
+        # an error), there is nothing new to list.
+        if (
+            dir_mtime_ns == self._listed_dir_mtime_ns
+            and not self._pending
+            and time.time_ns() - dir_mtime_ns > self.DIR_MTIME_GRANULARITY_NS
+        ):
+            return
+        self._listed_dir_mtime_ns = dir_mtime_ns
         
-        # Find all supported files
+        # Find all supported files. scandir filters on the name and the
+        # directory entry's type first, so only candidate files are stat'ed
+        # (and on Windows the entry already carries its stat result).
         new_files = []
-        for file_path in watch_path.iterdir():
-            if not file_path.is_file():
-                continue
-            
-            if file_path.suffix.lower() not in self.SUPPORTED_EXTENSIONS:
-                continue
-            
-            # Skip already processed files
-            file_key = str(file_path.absolute())
-            if file_key in self._state.processed_files:
-                continue
-            
-            # Skip files that are still being written (check if file is stable)
-            if not self._is_file_ready(file_path):
-                continue
-            
-            new_files.append(file_path)
+        seen = set()
+        present = set()
+        now = time.monotonic()
+        folder = str(watch_path.absolute())
+        with os.scandir(watch_path) as entries:
+            for entry in entries:
+                if not self._is_candidate_name(entry.name):
+                    continue
+                
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue  # Removed while scanning
+                
+                # Skip already processed files
+                file_key = os.path.join(folder, entry.name)
+                present.add(file_key)
+                if file_key in self._processed_files:
+                    continue
+                
+                seen.add(file_key)
+                if self._waiting_to_retry(file_key, st, now):
+                    continue
+                
+                # Skip files that are still being written (check if file is stable)
+                file_path = Path(file_key)
+                if not self._is_file_ready(file_path, file_key, st, now):
+                    continue
+                
+                new_files.append(file_path)
+        
+        # Forget pending (and failed) files that were removed
+        for file_key in self._pending.keys() - seen:
+            del self._pending[file_key]
+        for file_key in self._failures.keys() - seen:
+            del self._failures[file_key]
+        
+        # Forget processed files that are gone (normally moved to processed/),
+        # so the set stays the size of the folder. A file that reappears is
+        # caught by the file-hash duplicate check in process_new_fax.
+        self._processed_files &= present
         
         # Set initial queue count
-        self._state.files_in_queue = len(new_files)
+        self._update_state(files_in_queue=len(new_files))
         
-        # Process new files
-        for file_path in new_files:
-            try:
-                self._process_file(file_path)
+        if not new_files:
+            return
+        
+        # Process new files, several at a time so their LLM calls overlap
+        with ThreadPoolExecutor(
+            max_workers=min(self.concurrency, len(new_files)),
+            thread_name_prefix="fax-watcher",
+        ) as executor:
+            futures = {executor.submit(self._process_file, file_path): file_path for file_path in new_files}
+            for future in as_completed(futures):
+                file_path = futures[future]
                 # Update queue count after each file is processed
-                self._state.files_in_queue = max(0, self._state.files_in_queue - 1)
-            except Exception as e:
-                error_msg = f"Error processing {file_path.name}: {e}"
-                logger.error(error_msg)
-                self._state.errors.append(error_msg)
-                self._state.errors = self._state.errors[-10:]
+                with self._state_lock:
+                    self._state = replace(self._state, files_in_queue=max(0, self._state.files_in_queue - 1))
+                try:
+                    future.result()
+                except Exception as e:
+                    error_msg = f"Error processing {file_path.name}: {e}"
+                    logger.error(error_msg)
+                    self._record_error(error_msg)
+    
+    def _has_unsettled_files(self) -> bool:
+        """True if some file is still inside its debounce window."""
+        now = time.monotonic()
+        return any(now - since < self.DEBOUNCE_SECONDS for _, since in self._pending.values())
+    
+    def _waiting_to_retry(self, file_key: str, st: os.stat_result, now: float) -> bool:
+        """True if the file failed to process and its retry backoff has not expired."""
+        failure = self._failures.get(file_key)
+        if failure is None:
+            return False
+        signature, _, retry_at = failure
+        if signature != (st.st_ino, st.st_mtime_ns, st.st_size):
+            del self._failures[file_key]  # Replaced or rewritten; try it again
+            return False
+        return now < retry_at
+    
+    def _seconds_until_retry(self) -> Optional[float]:
+        """Time until the earliest failed file may be retried, if any is waiting."""
+        retry_times = [retry_at for _, _, retry_at in self._failures.values()]
+        if not retry_times:
+            return None
+        return max(0.0, min(retry_times) - time.monotonic())
+    
+    def _record_failure(self, file_key: str):
+        """Back off retrying a file whose processing just failed."""
+        pending = self._pending.get(file_key)
+        if pending is None:
+            return
+        previous = self._failures.get(file_key)
+        attempts = previous[1] + 1 if previous else 1
+        delay = min(self.RETRY_BASE_SECONDS * 2 ** (attempts - 1), self.RETRY_MAX_SECONDS)
+        self._failures[file_key] = (pending[0], attempts, time.monotonic() + delay)
+        logger.info(f"Retrying {os.path.basename(file_key)} in {delay}s (attempt {attempts} failed)")
+    
+    def _rename_back(self, claimed: Path, file_path: Path):
+        """Rename a claimed file back without waking the watcher for it."""
+        now = time.monotonic()
+        for path, quiet_until in list(self._own_renames.items()):
+            if quiet_until <= now:
+                self._own_renames.pop(path, None)
+        self._own_renames[str(file_path)] = now + self.OWN_RENAME_QUIET_SECONDS
+        claimed.rename(file_path)
     
-    def _is_file_ready(self, file_path: Path) -> bool:
+    def _is_file_ready(self, file_path: Path, file_key: str, st: os.stat_result, now: float) -> bool:
         """
         Check if a file is ready to be processed (not still being written).
+        
+        A file is ready once its inode, mtime and size have not changed for
+        DEBOUNCE_SECONDS across scans, so no scan has to sleep per file.
         """
         try:
-            # Check if file size is stable
-            size1 = file_path.stat().st_size
-            time.sleep(0.5)  # Short wait
-            size2 = file_path.stat().st_size
+            signature = (st.st_ino, st.st_mtime_ns, st.st_size)
             
-            if size1 != size2:
-                return False  # File is still being written
+            pending = self._pending.get(file_key)
+            if pending is None or pending[0] != signature:
+                self._pending[file_key] = (signature, now)
+                return False  # New or still being written
+            if now - pending[1] < self.DEBOUNCE_SECONDS:
+                return False
             
-            # Try to open the file exclusively
+            # Try to open the file; on POSIX also skip it if a writer still
+            # holds an exclusive lock on it (a non-blocking probe, no waiting).
             try:
                 with open(file_path, 'rb') as f:
                     f.read(1)
+                    if fcntl is not None:
+                        fcntl.flock(f, fcntl.LOCK_SH | fcntl.LOCK_NB)
+                        fcntl.flock(f, fcntl.LOCK_UN)
                 return True
             except (IOError, PermissionError):
                 return False
@@ -191,27 +488,76 @@ class FaxFolderWatcher:
         except Exception:
             return False
     
+    def _release_stale_claims(self, watch_path: Path):
+        """Rename files claimed by this host's dead watchers back to their names.
+        
+        Claims from other hosts are left alone: their pids mean nothing here,
+        and each host releases its own claims when its watcher starts.
+        """
+        try:
+            with os.scandir(watch_path) as entries:
+                names = [entry.name for entry in entries if entry.name.startswith(CLAIM_PREFIX)]
+        except OSError:
+            return
+        
+        for name in names:
+            host, _, rest = name[len(CLAIM_PREFIX):].partition("@")
+            pid, _, original = rest.partition("_")
+            if host != CLAIM_HOST or not pid.isdigit() or not original or _pid_running(int(pid)):
+                continue
+            try:
+                os.rename(watch_path / name, watch_path / original)
+                logger.info(f"Released stale claim on {original}")
+            except OSError as e:
+                logger.warning(f"Could not release stale claim {name}: {e}")
+    
+    def _claim(self, file_path: Path) -> Optional[Path]:
+        """Atomically rename the file to a claimed name; None if it is already gone."""
+        claimed = file_path.with_name(f"{CLAIM_PREFIX}{CLAIM_HOST}@{os.getpid()}_{file_path.name}")
+        try:
+            file_path.rename(claimed)
+        except FileNotFoundError:
+            return None  # Another watcher claimed (or someone removed) it first
+        return claimed
+    
     def _process_file(self, file_path: Path):
         """Process a single fax file."""
+        file_key = str(file_path.absolute())
+        claimed = self._claim(file_path)
+        if claimed is None:
+            logger.info(f"Skipped {file_path.name}: already taken by another watcher")
+            self._pending.pop(file_key, None)
+            return
+        
         logger.info(f"Processing new fax: {file_path.name}")
         
         try:
             # Set currently processing file
-            self._state.currently_processing_file = file_path.name
+            self._update_state(currently_processing_file=file_path.name)
             
-            result = process_new_fax(
-                file_path=str(file_path.absolute()),
-                filename=file_path.name
-            )
+            try:
+                result = process_new_fax(
+                    file_path=str(claimed.absolute()),
+                    filename=file_path.name,
+                    original_path=file_key,
+                )
+            except Exception:
+                # Give the file back; it is retried once its backoff expires
+                self._record_failure(file_key)
+                self._rename_back(claimed, file_path)
+                raise
+            
+            self._pending.pop(file_key, None)
+            self._failures.pop(file_key, None)
             
             if result:
                 logger.info(f"Processed fax {file_path.name}: category={result.ai_category}")
                 
                 # Mark as processed
-                self._state.processed_files.add(str(file_path.absolute()))
+                self._processed_files.add(file_key)
                 
                 # Optionally move file to processed folder
-                self._move_to_processed(file_path)
+                self._move_to_processed(claimed, file_path.name)
                 
                 # Call callbacks
                 for callback in self._callbacks:
@@ -220,49 +566,75 @@ class FaxFolderWatcher:
                     except Exception as e:
                         logger.error(f"Callback error: {e}")
             else:
-                # Duplicate file
+                # Duplicate file; leave it in the folder under its own name
                 logger.info(f"Skipped duplicate fax: {file_path.name}")
-                self._state.processed_files.add(str(file_path.absolute()))
+                self._rename_back(claimed, file_path)
+                self._processed_files.add(file_key)
                 
         except Exception as e:
             logger.error(f"Failed to process {file_path.name}: {e}")
             raise
         finally:
-            # Clear currently processing file
-            self._state.currently_processing_file = None
+            # Clear currently processing file, unless another file has started since
+            with self._state_lock:
+                if self._state.currently_processing_file == file_path.name:
+                    self._state = replace(self._state, currently_processing_file=None)
     
-    def _move_to_processed(self, file_path: Path):
-        """Move processed file to a 'processed' subfolder."""
+    def _move_to_processed(self, file_path: Path, name: str):
+        """Move processed file to a 'processed' subfolder under the given name."""
         try:
             processed_folder = file_path.parent / "processed"
-            processed_folder.mkdir(exist_ok=True)
+            if processed_folder != self._processed_folder:
+                processed_folder.mkdir(exist_ok=True)
+                self._processed_folder = processed_folder
             
-            dest_path = processed_folder / file_path.name
+            dest_path = processed_folder / name
             
             # Handle duplicate names
             counter = 1
             while dest_path.exists():
-                stem = file_path.stem
-                suffix = file_path.suffix
+                stem = Path(name).stem
+                suffix = Path(name).suffix
                 dest_path = processed_folder / f"{stem}_{counter}{suffix}"
                 counter += 1
             
-            file_path.rename(dest_path)
-            logger.info(f"Moved {file_path.name} to processed folder")
+            # A rename when possible; if processed/ is on another filesystem
+            # (e.g. a bind mount), a copy (sendfile on Linux) plus unlink.
+            try:
+                shutil.move(file_path, dest_path)
+            except FileNotFoundError:
+                if not file_path.exists():
+                    raise
+                # processed/ was removed while running; recreate it and retry
+                processed_folder.mkdir(exist_ok=True)
+                shutil.move(file_path, dest_path)
+            logger.info(f"Moved {name} to processed folder")
             
         except Exception as e:
             logger.warning(f"Could not move file to processed folder: {e}")
+            # Don't leave it under its claimed name; as a processed file it is
+            # skipped by later scans either way.
+            try:
+                file_path.rename(file_path.with_name(name))
+            except OSError:
+                pass
     
     def manual_scan(self):
         """Trigger an immediate scan of the folder."""
         if not self._state.is_running:
-            # Do a one-time scan
+            # Do a one-time scan; files seen for the first time need a
+            # second look after the debounce window.
             try:
                 self._scan_folder()
+                if self._has_unsettled_files():
+                    time.sleep(self.DEBOUNCE_SECONDS)
+                    self._scan_folder()
             except Exception as e:
                 logger.error(f"Manual scan error: {e}")
-                self._state.errors.append(str(e))
-        # If running, the next scan will happen automatically
+                self._record_error(str(e))
+        else:
+            # Wake the watch loop so it scans now instead of at the next interval
+            self._wake_event.set()
 
 
 # Global watcher instance
@@ -0,0 +1,55 @@
+"""
+LLM router - answer simple prompts with a small model, the rest with the main one.
+
+Short prompts with a small output budget go to OLLAMA_SMALL_MODEL first and are
+escalated to OLLAMA_MODEL if the small model fails or returns nothing. Without
+OLLAMA_SMALL_MODEL every prompt goes straight to the main model.
+"""
+
+import logging
+import os
+
+from app.services.llm_service import generate_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PROMPT_CHARS = 2000
+DEFAULT_MAX_TOKENS = 256
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+def get_small_model() -> str | None:
+    """Return the small model name, or None when routing is disabled."""
+
+    return os.getenv("OLLAMA_SMALL_MODEL") or None
+
+
+def is_simple(prompt: str, max_tokens: int) -> bool:
+    """True if the request is small enough to try on the small model."""
+
+    return (
+        len(prompt) <= _int_env("LLM_ROUTER_MAX_PROMPT_CHARS", DEFAULT_MAX_PROMPT_CHARS)
+        and max_tokens <= _int_env("LLM_ROUTER_MAX_TOKENS", DEFAULT_MAX_TOKENS)
+    )
+
+
+def generate(prompt: str, max_tokens: int = 128) -> str:
+    """Generate text, trying the small model first for simple requests."""
+
+    small_model = get_small_model()
+    if small_model and is_simple(prompt, max_tokens):
+        try:
+            output = generate_text(prompt, max_tokens=max_tokens, model=small_model)
+            if output.strip():
+                return output
+            logger.info("Small model %s returned no output, escalating", small_model)
+        except Exception as e:
+            logger.warning("Small model %s failed, escalating: %s", small_model, e)
+
+    return generate_text(prompt, max_tokens=max_tokens)
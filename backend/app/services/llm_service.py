@@ -1,8 +1,12 @@
 from functools import lru_cache
+import json
+import logging
 import os
 
 from ollama import Client
 
+logger = logging.getLogger(__name__)
+
 
 @lru_cache(maxsize=1)
 def get_ollama_client() -> Client:
@@ -16,18 +20,104 @@ def get_ollama_client() -> Client:
     return Client(host=base_url)
 
 
-def generate_text(prompt: str, max_tokens: int = 128) -> str:
-    """Generate text using a local Ollama model (e.g. mistral)."""
+def generate_text(
+    prompt: str,
+    max_tokens: int = 128,
+    model: str | None = None,
+    schema: dict | None = None,
+) -> str:
+    """Generate text using a local Ollama model (e.g. mistral).
+
+    Uses OLLAMA_MODEL unless a model name is given. With a JSON schema, Ollama
+    constrains the output to JSON matching it (e.g. a category from a fixed enum).
+    """
 
     client = get_ollama_client()
 
-    model_name = os.environ.get("OLLAMA_MODEL", "mistral")
+    model_name = model or os.environ.get("OLLAMA_MODEL", "mistral")
+    structured = bool(schema)
 
-    response = client.chat(
+    stream = client.chat(
         model=model_name,
         messages=[{"role": "user", "content": prompt}],
         options={"num_predict": max_tokens},
+        format=schema,
+        stream=True,
     )
 
-    # Ollama chat returns a dict with a "message" field
-    return response["message"]["content"]
+    # Structured output is complete once the JSON object closes, but models
+    # sometimes keep emitting whitespace until num_predict. Stop reading
+    # there; closing the stream makes Ollama cancel the rest of the decode.
+    pieces: list[str] = []
+    try:
+        for chunk in stream:
+            piece = chunk["message"]["content"]
+            pieces.append(piece)
+            if structured and "}" in piece and _is_complete_json("".join(pieces)):
+                break
+    finally:
+        stream.close()
+
+    return "".join(pieces)
+
+
+def _is_complete_json(raw: str) -> bool:
+    """True if raw (ignoring leading whitespace) starts with a complete JSON value."""
+
+    try:
+        _JSON_DECODER.raw_decode(raw.lstrip())
+        return True
+    except ValueError:
+        return False
+
+
+def preload_model(model: str | None = None) -> None:
+    """Load the model into the Ollama server's memory ahead of the first request.
+
+    Ollama loads a model on its first request, which can take several seconds;
+    a prompt-less generate loads it without generating anything. Failures
+    (e.g. Ollama not running yet) are logged and otherwise ignored.
+    """
+
+    model_name = model or os.environ.get("OLLAMA_MODEL", "mistral")
+    try:
+        get_ollama_client().generate(model=model_name)
+    except Exception as e:
+        logger.warning(f"Could not preload Ollama model '{model_name}': {e}")
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def first_json_object(raw: str) -> dict | None:
+    """Return the first JSON object in model output, or None if there is none.
+
+    Models sometimes wrap the JSON in prose. Each "{" is tried in turn with the
+    C decoder, which stops at the end of the object it parsed, so trailing text
+    (even with more braces) is never scanned or backtracked over.
+    """
+
+    start = raw.find("{")
+    while start != -1:
+        try:
+            payload, _ = _JSON_DECODER.raw_decode(raw, start)
+            return payload
+        except ValueError:
+            start = raw.find("{", start + 1)
+    return None
+
+
+def get_embedding_model() -> str:
+    """Return the name of the Ollama embedding model (e.g. nomic-embed-text)."""
+
+    return os.environ.get("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+
+
+def embed_text(text: str) -> list[float]:
+    """Embed text using a local Ollama embedding model."""
+
+    client = get_ollama_client()
+
+    response = client.embed(model=get_embedding_model(), input=text)
+
+    return list(response["embeddings"][0])
@@ -0,0 +1,87 @@
+"""
+OCR worker pool - runs text extraction in separate processes.
+
+Tesseract is CPU-bound and would otherwise block the FastAPI event loop (or the
+folder watcher thread) for seconds per page. Each worker is limited to a single
+OpenMP thread: N single-threaded Tesseract processes beat one multi-threaded one.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, Callable, Iterator
+
+import pytesseract
+
+
+class _TesseractMissing(Exception):
+    """Picklable stand-in for pytesseract's TesseractNotFoundError."""
+
+
+def init_worker() -> None:
+    """Pool initializer: keep Tesseract to one thread per worker process."""
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+@lru_cache(maxsize=1)
+def get_ocr_pool() -> ProcessPoolExecutor:
+    """Return the shared OCR process pool.
+
+    Pool size defaults to the CPU count and can be overridden with OCR_WORKERS.
+    """
+
+    try:
+        max_workers = int(os.getenv("OCR_WORKERS") or "0")
+    except ValueError:
+        max_workers = 0
+
+    return ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count(),
+        initializer=init_worker,
+    )
+
+
+def shutdown_ocr_pool() -> None:
+    """Stop the OCR pool if it was started."""
+    if get_ocr_pool.cache_info().currsize:
+        get_ocr_pool().shutdown(wait=True, cancel_futures=True)
+        get_ocr_pool.cache_clear()
+
+
+def _invoke(fn: Callable[..., Any], *args: Any) -> Any:
+    # TesseractNotFoundError cannot be unpickled (its __init__ takes no
+    # arguments), so swap it for a marker that survives the trip back.
+    try:
+        return fn(*args)
+    except pytesseract.pytesseract.TesseractNotFoundError:
+        raise _TesseractMissing() from None
+
+
+def run_ocr_sync(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run ``fn(*args)`` on the OCR pool and wait for the result.
+
+    For use from worker threads (e.g. the folder watcher).
+    """
+
+    try:
+        return get_ocr_pool().submit(_invoke, fn, *args).result()
+    except _TesseractMissing:
+        raise pytesseract.pytesseract.TesseractNotFoundError() from None
+
+
+def map_ocr(fn: Callable[..., Any], *iterables: Any) -> list[Any]:
+    """Run ``fn`` over the iterables on the OCR pool, preserving order."""
+
+    try:
+        return list(get_ocr_pool().map(partial(_invoke, fn), *iterables))
+    except _TesseractMissing:
+        raise pytesseract.pytesseract.TesseractNotFoundError() from None
+
+
+def imap_ocr(fn: Callable[..., Any], *iterables: Any) -> Iterator[Any]:
+    """Like ``map_ocr`` but yields each result, in order, as soon as it is ready."""
+
+    try:
+        yield from get_ocr_pool().map(partial(_invoke, fn), *iterables)
+    except _TesseractMissing:
+        raise pytesseract.pytesseract.TesseractNotFoundError() from None
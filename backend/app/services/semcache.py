@@ -0,0 +1,200 @@
+"""
+Semantic cache - reuse LLM results for near-duplicate documents.
+
+Faxes built from the same template (different patient header, same body) get
+the same classification. We embed a canonicalized prefix of the text and reuse
+the stored result when the nearest cached entry is above a cosine-similarity
+threshold. Vectors are kept in memory per kind and persisted to SQLite so the
+cache survives restarts.
+
+Exact resends are caught first by a hash of the full text, which needs no
+embedding call at all. Results that describe the patient (summaries) must only
+ever be reused for the exact same text: pass ``semantic=False`` for those.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Callable
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal
+from app.models.llm_cache import LlmCacheEntry
+from app.models.semantic_cache import SemanticCacheEntry
+from app.services.llm_service import embed_text, get_embedding_model
+
+logger = logging.getLogger(__name__)
+
+# Only the start of a document is embedded; templates diverge early if at all.
+PREFIX_CHARS = 2048
+DEFAULT_THRESHOLD = 0.92
+
+_lock = threading.Lock()
+_indexes: dict[str, tuple[np.ndarray, list[str]]] = {}
+_loaded_model: str | None = None
+
+
+def _enabled() -> bool:
+    return (os.getenv("SEMANTIC_CACHE_ENABLED") or "1").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _threshold() -> float:
+    try:
+        return float(os.getenv("SEMANTIC_CACHE_THRESHOLD") or DEFAULT_THRESHOLD)
+    except ValueError:
+        return DEFAULT_THRESHOLD
+
+
+def _canonicalize(text: str) -> str:
+    """Lowercase and collapse whitespace so OCR spacing noise doesn't matter."""
+    return " ".join(text[: PREFIX_CHARS * 2].split()).lower()[:PREFIX_CHARS]
+
+
+@lru_cache(maxsize=32)
+def _embed_canonical(canonical: str) -> np.ndarray:
+    vector = np.asarray(embed_text(canonical), dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    if not norm:
+        raise ValueError("Embedding model returned a zero vector")
+    return vector / norm
+
+
+def _embed(text: str) -> np.ndarray | None:
+    try:
+        return _embed_canonical(_canonicalize(text))
+    except Exception as e:
+        logger.warning(f"Semantic cache disabled for this call, embedding failed: {e}")
+        return None
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+def _get_exact(kind: str, text_hash: str) -> str | None:
+    db: Session = SessionLocal()
+    try:
+        return db.scalar(
+            select(LlmCacheEntry.value).where(
+                LlmCacheEntry.kind == kind, LlmCacheEntry.text_hash == text_hash
+            )
+        )
+    finally:
+        db.close()
+
+
+def _put_exact(kind: str, text_hash: str, value: str) -> None:
+    db: Session = SessionLocal()
+    try:
+        db.execute(
+            sqlite_insert(LlmCacheEntry)
+            .values(kind=kind, text_hash=text_hash, value=value)
+            .on_conflict_do_nothing()
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _load_indexes(model: str) -> None:
+    """(Re)build the in-memory indexes from rows written by the current model."""
+    global _loaded_model
+
+    vectors: dict[str, list[np.ndarray]] = {}
+    values: dict[str, list[str]] = {}
+
+    db: Session = SessionLocal()
+    try:
+        rows = db.query(
+            SemanticCacheEntry.kind,
+            SemanticCacheEntry.embedding,
+            SemanticCacheEntry.value,
+        ).filter(SemanticCacheEntry.model == model).order_by(SemanticCacheEntry.id).all()
+    finally:
+        db.close()
+
+    for kind, embedding, value in rows:
+        vectors.setdefault(kind, []).append(np.frombuffer(embedding, dtype=np.float32))
+        values.setdefault(kind, []).append(value)
+
+    _indexes.clear()
+    for kind, kind_vectors in vectors.items():
+        _indexes[kind] = (np.vstack(kind_vectors), values[kind])
+    _loaded_model = model
+
+
+def _lookup(kind: str, vector: np.ndarray) -> str | None:
+    matrix, values = _indexes.get(kind, (None, []))
+    if matrix is None or matrix.shape[1] != vector.shape[0]:
+        return None
+
+    similarities = matrix @ vector
+    best = int(np.argmax(similarities))
+    if similarities[best] >= _threshold():
+        return values[best]
+    return None
+
+
+def _insert(kind: str, model: str, vector: np.ndarray, value: str) -> None:
+    db: Session = SessionLocal()
+    try:
+        db.add(SemanticCacheEntry(kind=kind, model=model, embedding=vector.tobytes(), value=value))
+        db.commit()
+    finally:
+        db.close()
+
+    matrix, values = _indexes.get(kind, (None, []))
+    if matrix is None or matrix.shape[1] != vector.shape[0]:
+        _indexes[kind] = (vector.reshape(1, -1), [value])
+    else:
+        _indexes[kind] = (np.vstack([matrix, vector]), values + [value])
+
+
+def get_or_compute(
+    key_text: str, kind: str, compute_fn: Callable[[], Any], semantic: bool = True
+) -> Any:
+    """Return a cached result for text similar to ``key_text``, or compute and store it.
+
+    ``compute_fn`` must return a JSON-serializable value; cache hits return the
+    JSON-decoded value (so tuples come back as lists). Falls through to
+    ``compute_fn`` whenever the cache is disabled or embedding fails. With
+    ``semantic=False`` only the exact-text tier is used, for results (like
+    summaries) that differ between documents built from the same template.
+    """
+
+    if not _enabled() or not key_text.strip():
+        return compute_fn()
+
+    text_hash = _text_hash(key_text)
+    cached = _get_exact(kind, text_hash)
+    if cached is not None:
+        return json.loads(cached)
+
+    vector = _embed(key_text) if semantic else None
+    if vector is None:
+        value = compute_fn()
+        _put_exact(kind, text_hash, json.dumps(value))
+        return value
+
+    model = get_embedding_model()
+    with _lock:
+        if _loaded_model != model:
+            _load_indexes(model)
+        cached = _lookup(kind, vector)
+    if cached is not None:
+        _put_exact(kind, text_hash, cached)
+        return json.loads(cached)
+
+    value = compute_fn()
+    encoded = json.dumps(value)
+    _put_exact(kind, text_hash, encoded)
+    with _lock:
+        _insert(kind, model, vector, encoded)
+    return value